@@ -0,0 +1,147 @@
+# auth_benchmark.py - Load generator for the auth server
+# Builds a throwaway user store, starts auth_server in its own process, runs
+# N client threads doing M logins each, and compares that with the old way:
+# one new Python process (and one users.json parse) per login.
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import threading
+import statistics
+import subprocess
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import auth_server
+from auth_client import AuthClient
+from user_store import UserStore, new_password_record
+
+# What a front-end used to do for every login
+SPAWN_LOGIN = """
+import sys
+sys.path.insert(0, {root!r})
+from user_store import UserStore
+store = UserStore("users.json")
+record = store.get("user0")
+assert record is not None and store.verify("user0", record, "password0")
+"""
+
+def make_store(directory, users, params):
+    store = UserStore(os.path.join(directory, "users.json"))
+    store.add_many((f"user{i}", new_password_record(f"password{i}", params)) for i in range(users))
+    with open(os.path.join(directory, "kdf.json"), "w") as f:
+        f.write(json.dumps(params))  # so verify() doesn't rehash everyone mid-benchmark
+
+# -------------------------------
+# Server side (runs in its own process)
+# -------------------------------
+def run_server(directory, socket_path, workers, conn):
+    os.chdir(directory)
+
+    async def serve():
+        store = UserStore("users.json")
+        store.refresh()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            stop = asyncio.Event()
+            asyncio.get_running_loop().add_reader(conn.fileno(), stop.set)
+            server = await auth_server.start_server(socket_path, store, pool)
+            conn.send("ready")
+            await stop.wait()
+            server.close()
+
+    asyncio.run(serve())
+
+# -------------------------------
+# Client side
+# -------------------------------
+def run_client(socket_path, users, logins, pipeline, latencies):
+    pairs = [(f"user{i % users}", f"password{i % users}") for i in range(logins)]
+    with AuthClient(socket_path) as auth:
+        if pipeline:
+            start = time.perf_counter()
+            assert all(auth.verify_many(pairs))
+            latencies.append((time.perf_counter() - start) / logins)
+        else:
+            for username, password in pairs:
+                start = time.perf_counter()
+                assert auth.verify(username, password)
+                latencies.append(time.perf_counter() - start)
+
+def time_spawned_logins(directory, count):
+    """Seconds per login when every login is its own Python process."""
+    code = SPAWN_LOGIN.format(root=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    start = time.perf_counter()
+    for _ in range(count):
+        subprocess.run([sys.executable, "-c", code], cwd=directory, check=True)
+    return (time.perf_counter() - start) / count
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the auth server.")
+    parser.add_argument("-n", "--clients", type=int, default=8, help="concurrent client threads")
+    parser.add_argument("-m", "--logins", type=int, default=200, help="logins per client")
+    parser.add_argument("-u", "--users", type=int, default=100, help="users in the test store")
+    parser.add_argument("--iterations", type=int, default=20_000, help="PBKDF2 iterations per hash")
+    parser.add_argument("--workers", type=int, default=auth_server.VERIFY_WORKERS,
+                        help="server verify threads")
+    parser.add_argument("--pipeline", action="store_true", help="send logins in pipelined batches")
+    parser.add_argument("--spawn", type=int, default=5,
+                        help="also time this many process-per-login runs (0 to skip)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        params = {"name": "pbkdf2", "iterations": args.iterations}
+        make_store(directory, args.users, params)
+        socket_path = os.path.join(directory, "auth.sock")
+
+        parent_conn, child_conn = multiprocessing.Pipe()
+        proc = multiprocessing.Process(target=run_server,
+                                       args=(directory, socket_path, args.workers, child_conn))
+        proc.start()
+        parent_conn.recv()  # wait until the server is listening
+
+        latencies = []
+        threads = [threading.Thread(target=run_client,
+                                    args=(socket_path, args.users, args.logins, args.pipeline, latencies))
+                   for _ in range(args.clients)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        parent_conn.send("stop")
+        proc.join()
+
+        spawned = time_spawned_logins(directory, args.spawn) if args.spawn else None
+
+    total = args.clients * args.logins
+    hash_time = statistics.median(
+        timed(lambda: new_password_record("x", params)) for _ in range(20))
+    print("=== Auth Server Benchmark ===")
+    mode = "pipelined" if args.pipeline else "one at a time"
+    print(f"{args.clients} clients x {args.logins} logins ({mode}), "
+          f"PBKDF2 x {args.iterations:,} ({hash_time * 1000:.1f} ms/hash), "
+          f"{args.workers} server threads\n")
+    print(f"Throughput: {total / elapsed:,.0f} logins/s")
+    if args.pipeline:
+        print(f"Time per login per client: {statistics.mean(latencies) * 1000:.2f} ms")
+    else:
+        cuts = statistics.quantiles(latencies, n=100)
+        print(f"Latency: p50 {cuts[49] * 1000:.2f} ms | p95 {cuts[94] * 1000:.2f} ms "
+              f"| p99 {cuts[98] * 1000:.2f} ms")
+    if spawned is not None:
+        print(f"\nProcess per login: {spawned * 1000:.1f} ms each "
+              f"({1 / spawned:,.1f} logins/s from one front-end)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# auth_client.py - Client library for auth_server.py
+#
+#   from auth_client import AuthClient
+#   with AuthClient("auth.sock") as auth:
+#       if auth.verify(username, password):
+#           ...
+#
+# One AuthClient is one connection; give each thread its own.
+
+import json
+import socket
+
+SOCKET_PATH = "auth.sock"
+WINDOW = 128  # requests verify_many() keeps in flight (below the server's MAX_PENDING)
+
+class AuthClient:
+    def __init__(self, socket_path=SOCKET_PATH, timeout=30):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(socket_path)
+        self.file = self.sock.makefile("rwb")
+        self.next_id = 0
+
+    def send(self, request):
+        self.next_id += 1
+        request["id"] = self.next_id
+        self.file.write(json.dumps(request).encode() + b"\n")
+        return self.next_id
+
+    def receive(self):
+        line = self.file.readline()
+        if not line:
+            raise ConnectionError("Auth server closed the connection.")
+        reply = json.loads(line)
+        if "error" in reply:
+            raise ValueError(f"Auth server: {reply['error']}")
+        return reply
+
+    def verify(self, username, password):
+        """True if the password is right for this user."""
+        self.send({"op": "verify", "username": username, "password": password})
+        self.file.flush()
+        return self.receive()["ok"]
+
+    def verify_many(self, pairs):
+        """Check many (username, password) pairs over this one connection.
+
+        Requests are pipelined WINDOW at a time, so the server works on them in
+        parallel. Returns a list of booleans in the same order as pairs.
+        """
+        results = []
+        for start in range(0, len(pairs), WINDOW):
+            ids = [self.send({"op": "verify", "username": username, "password": password})
+                   for username, password in pairs[start:start + WINDOW]]
+            self.file.flush()
+            replies = {}
+            for _ in ids:
+                reply = self.receive()
+                replies[reply["id"]] = reply["ok"]
+            results.extend(replies[i] for i in ids)
+        return results
+
+    def ping(self):
+        self.send({"op": "ping"})
+        self.file.flush()
+        return self.receive()["ok"]
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
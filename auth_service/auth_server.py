@@ -0,0 +1,146 @@
+# auth_server.py - Authentication daemon
+# Keeps a user store in memory and answers login checks over a Unix socket, so
+# front-ends no longer start a Python process (and parse users.json) per login.
+#
+# Protocol: one JSON object per line in each direction.
+#   {"id": 1, "op": "verify", "username": "...", "password": "..."}  ->  {"id": 1, "ok": true}
+#   {"id": 2, "op": "ping"}                                           ->  {"id": 2, "ok": true}
+# A wrong password and an unknown user both answer {"ok": false}.
+# Requests on one connection may be pipelined; each reply carries its request's
+# id and replies can come back in a different order.
+#
+# Password hashing runs in a thread pool. hashlib's PBKDF2 and scrypt release
+# the GIL, so slow KDFs run side by side and never stall the event loop.
+#
+# Run it from the app folder whose users.json it should serve:
+#   python ../auth_service/auth_server.py --socket /run/myapp/auth.sock
+
+import os
+import sys
+import json
+import asyncio
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from user_store import UserStore, check_password, new_password_record
+
+SOCKET_PATH = "auth.sock"
+USERS_FILE = "users.json"
+VERIFY_WORKERS = os.cpu_count() or 4
+MAX_REQUEST_SIZE = 64 * 1024  # longest request line accepted
+MAX_PENDING = 256             # requests one connection may have in flight
+
+dummy_records = {}  # KDF params (as JSON) -> record for a random password nobody knows
+
+def dummy_record(params):
+    key = json.dumps(params, sort_keys=True)
+    if key not in dummy_records:
+        dummy_records[key] = new_password_record(os.urandom(16).hex(), params)
+    return dummy_records[key]
+
+def verify_login(store, username, password):
+    """Runs in the thread pool: look the user up and check the password."""
+    record = store.get(username)
+    if record is None:
+        # Pay for a real KDF run anyway, so response times don't reveal which names exist
+        check_password(dummy_record(store.kdf), password)
+        return False
+    return store.verify(username, record, password)
+
+async def handle_request(request, store, pool):
+    op = request.get("op")
+    if op == "ping":
+        return {"ok": True}
+    if op == "verify":
+        username, password = request.get("username"), request.get("password")
+        if not isinstance(username, str) or not isinstance(password, str):
+            return {"ok": False, "error": "username and password must be strings"}
+        ok = await asyncio.get_running_loop().run_in_executor(pool, verify_login, store, username, password)
+        return {"ok": ok}
+    return {"ok": False, "error": f"unknown op {op!r}"}
+
+async def answer(request, writer, store, pool, slots):
+    try:
+        try:
+            reply = await handle_request(request, store, pool)
+        except Exception as e:
+            # A broken record or a failed journal write must still get a reply,
+            # or the client waits for its timeout
+            print(f"⚠️ Request failed: {e!r}")
+            reply = {"ok": False, "error": "internal error"}
+        reply["id"] = request.get("id")
+        writer.write(json.dumps(reply).encode() + b"\n")
+        await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        slots.release()
+
+async def handle_connection(reader, writer, store, pool):
+    """Read requests from one client and answer each as soon as it is done."""
+    slots = asyncio.Semaphore(MAX_PENDING)
+    tasks = set()
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError
+            except ValueError:
+                writer.write(b'{"id": null, "ok": false, "error": "request must be a JSON object"}\n')
+                continue
+            await slots.acquire()  # stop reading while this client has too much in flight
+            task = asyncio.create_task(answer(request, writer, store, pool, slots))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+    except ValueError:
+        print("⚠️ Request line too long, closing connection.")
+    except ConnectionError:
+        pass
+    finally:
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        writer.close()
+
+async def start_server(socket_path, store, pool):
+    """Listen on socket_path (replacing a stale socket file). Returns the asyncio server."""
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    # Create the socket as 0600 from the start (only this user's processes may ask);
+    # a chmod afterwards would leave a window where anyone could connect
+    old_umask = os.umask(0o077)
+    try:
+        server = await asyncio.start_unix_server(
+            lambda reader, writer: handle_connection(reader, writer, store, pool),
+            socket_path, limit=MAX_REQUEST_SIZE, backlog=1024)
+    finally:
+        os.umask(old_umask)
+    return server
+
+async def main(socket_path=SOCKET_PATH, users_file=USERS_FILE, workers=VERIFY_WORKERS):
+    store = UserStore(users_file)
+    store.refresh()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        server = await start_server(socket_path, store, pool)
+        print("🔐 Auth server started.")
+        print(f"Serving {len(store.users)} users from '{users_file}' on {socket_path} "
+              f"({workers} verify threads)...")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            os.remove(socket_path)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Answer login checks over a Unix socket.")
+    parser.add_argument("--socket", default=SOCKET_PATH, help=f"socket path (default {SOCKET_PATH})")
+    parser.add_argument("--users-file", default=USERS_FILE, help=f"user store (default {USERS_FILE})")
+    parser.add_argument("--workers", type=int, default=VERIFY_WORKERS, help="password-hashing threads")
+    args = parser.parse_args()
+    try:
+        asyncio.run(main(args.socket, args.users_file, args.workers))
+    except KeyboardInterrupt:
+        print("\nServer stopped.")
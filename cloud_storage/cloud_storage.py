@@ -1,32 +1,31 @@
 # cloud_storage.py
 # Secure cloud-like storage and key management system
+# (users are kept by the shared user_store module)
 
 import os
-import json
-import hashlib
-import binascii
 from datetime import datetime
 from cryptography.fernet import Fernet
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from user_store import UserStore, new_password_record
 
 USERS_FILE = "users.json"
 STORAGE_DIR = "cloud_storage"
 KEY_DIR = "keys"
 
+store = UserStore(USERS_FILE)
+
 # --- Setup Directories ---
 os.makedirs(STORAGE_DIR, exist_ok=True)
 os.makedirs(KEY_DIR, exist_ok=True)
 
-def hash_password(password, salt):
-    """Combine salt + password and return SHA256 hash."""
-    return hashlib.sha256(salt + password.encode()).hexdigest()
-
 def register_user():
     username = input("Choose a username: ")
     password = input("Choose a password: ")
 
-    salt = os.urandom(16)
-    hashed_pw = hash_password(password, salt)
-    salt_hex = binascii.hexlify(salt).decode()
+    if not store.add(username, new_password_record(password, store.kdf)):
+        print("⚠️ User already exists.\n")
+        return
 
     # Generate key and store it separately
     key = Fernet.generate_key()
@@ -34,41 +33,18 @@ def register_user():
     with open(key_path, "wb") as key_file:
         key_file.write(key)
 
-    users = {}
-    if os.path.exists(USERS_FILE):
-        with open(USERS_FILE, "r") as f:
-            users = json.load(f)
-
-    if username in users:
-        print("⚠️ User already exists.\n")
-        return
-
-    users[username] = {"salt": salt_hex, "hash": hashed_pw}
-    with open(USERS_FILE, "w") as f:
-        json.dump(users, f, indent=4)
-
     print(f"✅ User '{username}' registered successfully.\n")
 
 def login_user():
     username = input("Username: ")
     password = input("Password: ")
 
-    if not os.path.exists(USERS_FILE):
-        print("⚠️ No users found. Please register first.\n")
-        return None
-
-    with open(USERS_FILE, "r") as f:
-        users = json.load(f)
-
-    if username not in users:
+    user_data = store.get(username)
+    if user_data is None:
         print("❌ User not found.\n")
         return None
 
-    user_data = users[username]
-    salt = binascii.unhexlify(user_data["salt"])
-    hashed_pw = hash_password(password, salt)
-
-    if hashed_pw == user_data["hash"]:
+    if store.verify(username, user_data, password):
         key_path = os.path.join(KEY_DIR, f"{username}.key")
         if not os.path.exists(key_path):
             print("⚠️ Key file missing! Contact admin.\n")
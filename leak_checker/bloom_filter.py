@@ -0,0 +1,107 @@
+# bloom_filter.py
+# A Bloom filter over leaked SHA-1 hashes, used as a fast first check.
+#
+# "Definitely not leaked" answers come straight from a few bit probes; only a
+# possible hit falls through to the exact lookup (offline index or API).
+# The hashes are SHA-1 already, so the probe positions are taken from the
+# digest bytes instead of hashing again (double hashing: h1 + i * h2).
+#
+# File layout: 8-byte magic, uint64 bit count, uint32 probe count,
+# uint64 item count, then the bit array.
+
+import os
+import math
+import mmap
+import struct
+from offline_index import RECORDS_START
+
+try:
+    import numpy as np
+except ImportError:  # building falls back to plain Python (slower, same result)
+    np = None
+
+MAGIC = b"PWNBLM1\0"
+HEADER = struct.Struct("<8sQIQ")
+MASK64 = (1 << 64) - 1
+BUILD_CHUNK = 1_000_000  # hashes added per NumPy batch
+
+def filter_size(items, fp_rate):
+    """Return (bits, probes) for the requested false-positive rate."""
+    items = max(items, 1)
+    bits = math.ceil(-items * math.log(fp_rate) / math.log(2) ** 2)
+    bits = (bits + 7) // 8 * 8
+    probes = max(1, round(bits / items * math.log(2)))
+    return bits, probes
+
+def probe_positions(sha1, bits, probes):
+    """The bit positions a 20-byte SHA-1 digest maps to."""
+    h1 = int.from_bytes(sha1[0:8], "little")
+    h2 = int.from_bytes(sha1[8:16], "little") | 1
+    return [((h1 + i * h2) & MASK64) % bits for i in range(probes)]
+
+def fill_bits_numpy(index, bits, probes):
+    """Set every hash's bits in vectorized batches. Returns the bit array as bytes."""
+    array = np.zeros(bits // 8, dtype=np.uint8)
+    # View the index records in place: first 16 hash bytes as two uint64s
+    record_type = np.dtype([("h1", "<u8"), ("h2", "<u8"), ("rest", "V4"), ("count", "<u4")])
+    records = np.frombuffer(index.mm, dtype=record_type, count=index.count, offset=RECORDS_START)
+    for start in range(0, len(records), BUILD_CHUNK):
+        chunk = records[start:start + BUILD_CHUNK]
+        h1 = chunk["h1"]
+        h2 = chunk["h2"] | np.uint64(1)
+        for i in range(probes):
+            positions = (h1 + np.uint64(i) * h2) % np.uint64(bits)  # wraps at 2**64 like MASK64
+            np.bitwise_or.at(array, positions >> np.uint64(3),
+                             np.uint8(1) << (positions & np.uint64(7)).astype(np.uint8))
+    return array.tobytes()
+
+def fill_bits_python(index, bits, probes):
+    array = bytearray(bits // 8)
+    for sha1, _ in index.records():
+        for position in probe_positions(sha1, bits, probes):
+            array[position >> 3] |= 1 << (position & 7)
+    return bytes(array)
+
+def build_bloom_filter(index, bloom_path, fp_rate=0.001):
+    """Build a filter from every hash in an OfflineIndex and save it. Returns (bits, probes)."""
+    bits, probes = filter_size(index.count, fp_rate)
+    if np is not None:
+        data = fill_bits_numpy(index, bits, probes)
+    else:
+        data = fill_bits_python(index, bits, probes)
+
+    tmp_path = bloom_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, bits, probes, index.count))
+        f.write(data)
+    os.replace(tmp_path, bloom_path)
+    return bits, probes
+
+class BloomFilter:
+    """A saved filter, memory-mapped so it is shared through the page cache."""
+
+    def __init__(self, bloom_path):
+        self.file = open(bloom_path, "rb")
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.bits, self.probes, self.count = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{bloom_path} is not a leaked-password Bloom filter.")
+
+    def might_contain(self, sha1_hex):
+        """False means the hash is certainly not in the set; True means check exactly."""
+        mm = self.mm
+        for position in probe_positions(bytes.fromhex(sha1_hex), self.bits, self.probes):
+            if not mm[HEADER.size + (position >> 3)] & (1 << (position & 7)):
+                return False
+        return True
+
+    def close(self):
+        self.mm.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
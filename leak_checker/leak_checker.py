@@ -1,39 +1,330 @@
 # leak_checker.py
 # Password Leak Checker using Have I Been Pwned API
 
+import os
+import csv
+import sys
+import gzip
+import json
+import time
 import hashlib
+import argparse
+import threading
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from offline_index import OfflineIndex, build_index
+from bloom_filter import BloomFilter, build_bloom_filter
 
-def check_password_leak(password):
+try:
+    import numpy as np
+except ImportError:  # batch audits fall back to a dict lookup per range
+    np = None
+
+# Point this at a local stand-in server (see mock_pwned_server.py) for testing
+API_URL = os.environ.get("PWNED_API_URL", "https://api.pwnedpasswords.com")
+# Set this to an index built with "build-index" to check passwords without network access
+INDEX_FILE = os.environ.get("PWNED_INDEX_FILE")
+# ...and this to a Bloom filter built with "build-bloom" to skip most exact lookups
+BLOOM_FILE = os.environ.get("PWNED_BLOOM_FILE")
+CACHE_DIR = "range_cache"
+CACHE_TTL = 24 * 60 * 60      # seconds before a cached range is revalidated
+MEMORY_CACHE_SIZE = 4096      # ranges kept in the in-memory LRU
+BATCH_WORKERS = 32            # concurrent range requests during a batch audit
+
+# prefix -> {"etag", "fetched_at", "body"}, least recently used first
+_memory_cache = OrderedDict()
+_memory_lock = threading.Lock()  # batch audits fetch from many threads
+
+# -------------------------------
+# Range cache (memory LRU + gzip files on disk)
+# -------------------------------
+def cache_path(prefix):
+    return os.path.join(CACHE_DIR, f"{prefix}.json.gz")
+
+def remember(prefix, entry):
+    """Put a range in the memory LRU, evicting the oldest one if it is full."""
+    with _memory_lock:
+        _memory_cache[prefix] = entry
+        _memory_cache.move_to_end(prefix)
+        if len(_memory_cache) > MEMORY_CACHE_SIZE:
+            _memory_cache.popitem(last=False)
+
+def load_cached_range(prefix):
+    """Return the cached entry for a prefix from memory or disk, or None."""
+    with _memory_lock:
+        entry = _memory_cache.get(prefix)
+        if entry is not None:
+            _memory_cache.move_to_end(prefix)
+            return entry
+    try:
+        with gzip.open(cache_path(prefix), "rt") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    remember(prefix, entry)
+    return entry
+
+def save_cached_range(prefix, entry):
+    remember(prefix, entry)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = cache_path(prefix) + f".{os.getpid()}.tmp"
+    with gzip.open(tmp_path, "wt") as f:
+        json.dump(entry, f)
+    os.replace(tmp_path, cache_path(prefix))
+
+def fetch_range(prefix, base_url=API_URL, session=requests):
+    """Return the API's range response for a 5-character SHA-1 prefix.
+
+    Fresh cache entries are used without touching the network. Expired
+    ones are revalidated with their ETag, so an unchanged range costs a
+    304 with no body instead of a full download.
+    """
+    entry = load_cached_range(prefix)
+    if entry is not None and time.time() - entry["fetched_at"] < CACHE_TTL:
+        return entry["body"]
+
+    headers = {}
+    if entry is not None and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    response = session.get(f"{base_url}/range/{prefix}", headers=headers, timeout=30)
+
+    if response.status_code == 304 and entry is not None:
+        entry["fetched_at"] = time.time()
+    elif response.status_code == 200:
+        entry = {"etag": response.headers.get("ETag"), "fetched_at": time.time(), "body": response.text}
+    else:
+        raise RuntimeError(f"Error fetching data: {response.status_code}")
+
+    save_cached_range(prefix, entry)
+    return entry["body"]
+
+def check_password_leak(password, base_url=API_URL, index=None, bloom=None):
     """
     Checks if a password has been leaked in known data breaches.
-    Uses the Have I Been Pwned API with k-anonymity for privacy.
+    Uses the Have I Been Pwned API with k-anonymity for privacy,
+    or a local OfflineIndex when one is given. A BloomFilter, if given,
+    answers most clean passwords before either of those is touched.
     """
     # Convert password to SHA-1 hash
     sha1password = hashlib.sha1(password.encode()).hexdigest().upper()
     first5, tail = sha1password[:5], sha1password[5:]
 
-    # API only needs the first 5 characters (privacy-safe)
-    url = f"https://api.pwnedpasswords.com/range/{first5}"
-    response = requests.get(url)
+    if bloom is not None and not bloom.might_contain(sha1password):
+        return 0
 
-    if response.status_code != 200:
-        raise RuntimeError(f"Error fetching data: {response.status_code}")
+    if index is not None:
+        return index.lookup(sha1password)
+
+    # API only needs the first 5 characters (privacy-safe)
+    body = fetch_range(first5, base_url)
 
     # Compare returned hashes with your password’s tail
-    for line in response.text.splitlines():
+    for line in body.splitlines():
         hash_suffix, count = line.split(":")
         if hash_suffix == tail:
             return int(count)
     return 0
 
-if __name__ == "__main__":
+# -------------------------------
+# Batch auditing
+# -------------------------------
+_local = threading.local()
+
+def get_session(pool_size=BATCH_WORKERS):
+    """One keep-alive requests.Session per worker thread."""
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        # Retry dropped connections and rate limiting with a short backoff
+        retries = Retry(total=5, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retries)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _local.session = session
+    return session
+
+def read_hashes(input_path, hashes=False):
+    """Yield (line number, SHA-1 hex) for every non-empty line of a file.
+
+    With hashes=True the lines are already SHA-1 hashes (e.g. from a
+    password database export) and are only validated.
+    """
+    with open(input_path, "r", encoding="utf-8", errors="surrogateescape") as f:
+        for line_no, line in enumerate(f, start=1):
+            value = line.rstrip("\r\n")
+            if not value:
+                continue
+            if hashes:
+                value = value.strip().upper()
+                if len(value) != 40 or any(c not in "0123456789ABCDEF" for c in value):
+                    print(f"⚠️ Line {line_no}: not a SHA-1 hash, skipped.", file=sys.stderr)
+                    continue
+                yield line_no, value
+            else:
+                yield line_no, hashlib.sha1(value.encode("utf-8", "surrogateescape")).hexdigest().upper()
+
+def group_by_prefix(input_path, hashes=False, bloom=None):
+    """Group every hash by its 5-character prefix so each range is fetched once.
+
+    Returns (groups, cleared): hashes a Bloom filter rules out are listed in
+    cleared instead, so their ranges are never fetched.
+    """
+    groups = defaultdict(list)
+    cleared = []
+    for line_no, sha1 in read_hashes(input_path, hashes):
+        if bloom is not None and not bloom.might_contain(sha1):
+            cleared.append((line_no, sha1))
+        else:
+            groups[sha1[:5]].append((line_no, sha1))
+    return groups, cleared
+
+def parse_range(body):
+    """Turn a range response into {suffix: count}."""
+    counts = {}
+    for line in body.splitlines():
+        suffix, count = line.split(":")
+        counts[suffix] = int(count)
+    return counts
+
+def parse_range_arrays(body):
+    """Parse a range response into (sorted suffixes, counts) NumPy arrays.
+
+    Every suffix is exactly 35 hex characters, so the lines are cut into
+    fixed-width columns instead of being split one by one. The suffixes
+    stay as fixed-width ASCII ("S35"), which sorts exactly like the
+    140-bit numbers they spell but does not overflow uint64.
+    """
+    lines = np.array(body.encode().split())
+    if not len(lines):
+        return np.array([], dtype="S35"), np.array([], dtype=np.uint64)
+    width = lines.dtype.itemsize
+    columns = lines.view(np.uint8).reshape(len(lines), width)
+    suffixes = np.ascontiguousarray(columns[:, :35]).view("S35").ravel()
+    counts = np.ascontiguousarray(columns[:, 36:]).view(f"S{width - 36}").ravel().astype(np.uint64)
+    order = np.argsort(suffixes, kind="stable")
+    return suffixes[order], counts[order]
+
+def match_range(body, tails):
+    """Return the breach count for each tail (suffix) of one prefix, in order."""
+    if np is None:
+        counts = parse_range(body)
+        return [counts.get(tail, 0) for tail in tails]
+
+    suffixes, counts = parse_range_arrays(body)
+    if not len(suffixes):
+        return [0] * len(tails)
+    wanted = np.array(tails, dtype="S35")
+    # One vectorized binary search for every tail of this prefix
+    positions = np.searchsorted(suffixes, wanted).clip(max=len(suffixes) - 1)
+    found = suffixes[positions] == wanted
+    return np.where(found, counts[positions], 0).tolist()
+
+def audit_prefix(prefix, base_url):
+    return prefix, fetch_range(prefix, base_url, get_session())
+
+def audit_offline(input_path, output_path, index, hashes=False, bloom=None):
+    """Like audit_passwords, but every lookup goes to a local index, in input order."""
+    checked = leaked = 0
+    with open(output_path, "w", newline="") as out:
+        writer = csv.writer(out)
+        writer.writerow(["line", "sha1", "count"])
+        for line_no, sha1 in read_hashes(input_path, hashes):
+            if bloom is not None and not bloom.might_contain(sha1):
+                count = 0
+            else:
+                count = index.lookup(sha1)
+            writer.writerow([line_no, sha1, count])
+            checked += 1
+            leaked += count > 0
+    return checked, leaked
+
+def audit_passwords(input_path, output_path, base_url=API_URL, hashes=False, workers=BATCH_WORKERS,
+                    bloom=None):
+    """Check every password (or SHA-1) in a file and stream results to CSV.
+
+    Returns (checked, leaked). Rows are written as ranges complete, so
+    they are not in input order; the line column says where each came from.
+    """
+    groups, cleared = group_by_prefix(input_path, hashes, bloom)
+    checked = len(cleared)
+    leaked = 0
+
+    with open(output_path, "w", newline="") as out, ThreadPoolExecutor(max_workers=workers) as pool:
+        writer = csv.writer(out)
+        writer.writerow(["line", "sha1", "count"])
+        writer.writerows([line_no, sha1, 0] for line_no, sha1 in cleared)
+        futures = [pool.submit(audit_prefix, prefix, base_url) for prefix in groups]
+        for future in as_completed(futures):
+            prefix, body = future.result()
+            group = groups[prefix]
+            counts = match_range(body, [sha1[5:] for _, sha1 in group])
+            writer.writerows([line_no, sha1, count] for (line_no, sha1), count in zip(group, counts))
+            checked += len(group)
+            leaked += sum(1 for count in counts if count)
+    return checked, leaked
+
+# -------------------------------
+# Main program
+# -------------------------------
+def interactive():
     print("=== Password Leak Checker ===")
     password = input("Enter a password to check: ")
-    count = check_password_leak(password)
+    index = OfflineIndex(INDEX_FILE) if INDEX_FILE else None
+    bloom = BloomFilter(BLOOM_FILE) if BLOOM_FILE else None
+    count = check_password_leak(password, index=index, bloom=bloom)
 
     if count:
         print(f"⚠️  This password has been found {count:,} times in known breaches!")
         print("Please choose a stronger, unique password.\n")
     else:
         print("✅ This password has NOT been found in any known breaches. Great choice!\n")
+
+def main():
+    parser = argparse.ArgumentParser(description="Check passwords against Have I Been Pwned.")
+    commands = parser.add_subparsers(dest="command")
+    audit = commands.add_parser("audit", help="check a whole file of passwords")
+    audit.add_argument("input", help="file with one password (or SHA-1 with --hashes) per line")
+    audit.add_argument("-o", "--output", default="leak_report.csv", help="CSV file to write")
+    audit.add_argument("--hashes", action="store_true", help="input lines are SHA-1 hashes")
+    audit.add_argument("--workers", type=int, default=BATCH_WORKERS, help="concurrent requests")
+    audit.add_argument("--base-url", default=API_URL, help="API base URL (e.g. a local mock)")
+    audit.add_argument("--index", default=INDEX_FILE, help="use an offline index instead of the API")
+    audit.add_argument("--bloom", default=BLOOM_FILE, help="Bloom filter to check before the index or the API")
+    build = commands.add_parser("build-index", help="convert a SHA1:COUNT dump into an offline index")
+    build.add_argument("dump", help="downloaded Pwned Passwords dump (SHA-1 format)")
+    build.add_argument("index", help="index file to create")
+    bloom = commands.add_parser("build-bloom", help="build a Bloom filter from an offline index")
+    bloom.add_argument("index", help="index made with build-index")
+    bloom.add_argument("bloom", help="filter file to create")
+    bloom.add_argument("--fp-rate", type=float, default=0.001, help="false-positive rate (default 0.001)")
+    args = parser.parse_args()
+
+    if args.command == "audit":
+        start = time.perf_counter()
+        bloom = BloomFilter(args.bloom) if args.bloom else None
+        if args.index:
+            with OfflineIndex(args.index) as index:
+                checked, leaked = audit_offline(args.input, args.output, index, args.hashes, bloom)
+        else:
+            checked, leaked = audit_passwords(args.input, args.output, args.base_url, args.hashes,
+                                              args.workers, bloom)
+        print(f"✅ Checked {checked:,} passwords in {time.perf_counter() - start:.1f}s.")
+        print(f"⚠️  {leaked:,} found in known breaches. Report saved to '{args.output}'.")
+    elif args.command == "build-index":
+        start = time.perf_counter()
+        count = build_index(args.dump, args.index)
+        print(f"✅ Indexed {count:,} hashes into '{args.index}' in {time.perf_counter() - start:.1f}s.")
+    elif args.command == "build-bloom":
+        start = time.perf_counter()
+        with OfflineIndex(args.index) as index:
+            bits, probes = build_bloom_filter(index, args.bloom, args.fp_rate)
+        print(f"✅ Bloom filter of {bits // 8 / 1e6:,.1f} MB with {probes} probes saved to "
+              f"'{args.bloom}' in {time.perf_counter() - start:.1f}s.")
+    else:
+        interactive()
+
+if __name__ == "__main__":
+    main()
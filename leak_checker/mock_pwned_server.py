@@ -0,0 +1,82 @@
+# mock_pwned_server.py
+# A local stand-in for the Pwned Passwords range API, for testing offline.
+# Run it, then: PWNED_API_URL=http://127.0.0.1:8085 python leak_checker.py
+
+import random
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+HOST = "127.0.0.1"
+PORT = 8085
+PADDING_PER_RANGE = 800  # the real API returns roughly this many suffixes per prefix
+
+# Passwords the mock reports as leaked, with their breach counts
+LEAKED = {
+    "password": 9545824,
+    "123456": 37359195,
+    "qwerty": 10556095,
+    "letmein": 1373341,
+    "hello123": 33582,
+}
+
+LEAKED_HASHES = {hashlib.sha1(p.encode()).hexdigest().upper(): n for p, n in LEAKED.items()}
+request_count = 0  # GET requests served, printed when the server stops
+count_lock = threading.Lock()
+
+def range_body(prefix):
+    """Build a realistic, deterministic response body for a prefix."""
+    rng = random.Random(prefix)
+    entries = {f"{rng.getrandbits(140):035X}": rng.randint(1, 5000) for _ in range(PADDING_PER_RANGE)}
+    for full_hash, count in LEAKED_HASHES.items():
+        if full_hash.startswith(prefix):
+            entries[full_hash[5:]] = count
+    return "\r\n".join(f"{suffix}:{count}" for suffix, count in sorted(entries.items()))
+
+class RangeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+    def do_GET(self):
+        global request_count
+        with count_lock:
+            request_count += 1
+        prefix = self.path.rsplit("/", 1)[-1].upper()
+        if not self.path.startswith("/range/") or len(prefix) != 5:
+            self.send_response(400)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        body = range_body(prefix).encode()
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # stay quiet, a batch audit makes thousands of requests
+
+def run(host=HOST, port=PORT):
+    server = ThreadingHTTPServer((host, port), RangeHandler)
+    print(f"🧪 Mock Pwned Passwords API on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        print(f"\nServed {request_count:,} requests.")
+
+if __name__ == "__main__":
+    try:
+        run()
+    except KeyboardInterrupt:
+        print("Mock server stopped.")
@@ -0,0 +1,158 @@
+# offline_index.py
+# Offline Pwned Passwords lookups for machines with no internet access.
+#
+# build_index() turns the downloadable "SHA1:COUNT" text dump into a compact
+# binary file, and OfflineIndex answers lookups by binary search over an mmap
+# of it, so the file is never loaded into RAM.
+#
+# File layout:
+#   header      8-byte magic + uint64 record count
+#   jump table  65537 uint64 record numbers, one per 2-byte hash prefix (+ end)
+#   records     sorted 24-byte records: 20-byte SHA-1 + uint32 count
+
+import os
+import mmap
+import heapq
+import struct
+import tempfile
+
+MAGIC = b"PWNIDX1\0"
+HEADER = struct.Struct("<8sQ")
+JUMP_ENTRIES = 65536 + 1
+JUMP_TABLE = struct.Struct(f"<{JUMP_ENTRIES}Q")
+RECORD = struct.Struct("<20sI")
+RECORDS_START = HEADER.size + JUMP_TABLE.size
+RUN_RECORDS = 4_000_000  # records sorted in memory at once when building (~260 MB of bytes objects)
+
+# -------------------------------
+# Building the index
+# -------------------------------
+def parse_dump(dump_path):
+    """Yield packed records from a dump of "SHA1:COUNT" lines (hex, any case)."""
+    with open(dump_path, "r") as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                sha1, count = line.split(":")
+                raw = bytes.fromhex(sha1)
+                if len(raw) != 20:
+                    raise ValueError  # e.g. the NTLM dump, which uses the same HASH:COUNT layout
+                yield RECORD.pack(raw, min(int(count), 0xFFFFFFFF))
+            except ValueError:
+                print(f"⚠️ Line {line_no}: not a SHA1:COUNT pair, skipped.")
+
+def write_runs(records, tmp_dir):
+    """Sort records in memory-sized chunks and write each chunk to a run file."""
+    runs = []
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= RUN_RECORDS:
+            runs.append(write_run(chunk, tmp_dir))
+            chunk = []
+    if chunk or not runs:
+        runs.append(write_run(chunk, tmp_dir))
+    return runs
+
+def write_run(chunk, tmp_dir):
+    chunk.sort()  # already-sorted dumps make this a single linear pass
+    fd, path = tempfile.mkstemp(dir=tmp_dir, suffix=".run")
+    with os.fdopen(fd, "wb") as f:
+        f.write(b"".join(chunk))
+    return path
+
+def read_run(path):
+    with open(path, "rb") as f:
+        while True:
+            record = f.read(RECORD.size)
+            if not record:
+                return
+            yield record
+
+def build_index(dump_path, index_path):
+    """Convert a text dump into a sorted binary index. Returns the record count.
+
+    Works for dumps far bigger than RAM: chunks are sorted separately and
+    merged, and duplicate hashes are dropped.
+    """
+    tmp_dir = os.path.dirname(os.path.abspath(index_path))
+    runs = write_runs(parse_dump(dump_path), tmp_dir)
+    jump = [0] * JUMP_ENTRIES
+    count = 0
+    tmp_index = index_path + ".tmp"
+    try:
+        with open(tmp_index, "wb") as out:
+            out.write(b"\0" * RECORDS_START)  # header and jump table are filled in last
+            previous = None
+            for record in heapq.merge(*(read_run(path) for path in runs)):
+                sha1 = record[:20]
+                if sha1 == previous:
+                    continue
+                previous = sha1
+                out.write(record)
+                jump[(sha1[0] << 8 | sha1[1]) + 1] += 1
+                count += 1
+
+            # Turn bucket sizes into the record number where each bucket starts
+            for i in range(1, JUMP_ENTRIES):
+                jump[i] += jump[i - 1]
+            out.seek(0)
+            out.write(HEADER.pack(MAGIC, count))
+            out.write(JUMP_TABLE.pack(*jump))
+        os.replace(tmp_index, index_path)
+    finally:
+        for path in runs:
+            os.remove(path)
+        if os.path.exists(tmp_index):
+            os.remove(tmp_index)
+    return count
+
+# -------------------------------
+# Looking hashes up
+# -------------------------------
+class OfflineIndex:
+    """A memory-mapped index; only the pages a lookup touches are read from disk."""
+
+    def __init__(self, index_path):
+        self.file = open(index_path, "rb")
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{index_path} is not a pwned password index.")
+
+    def lookup(self, sha1_hex):
+        """Return how often a SHA-1 (hex) was seen in breaches, or 0."""
+        target = bytes.fromhex(sha1_hex)
+        bucket = target[0] << 8 | target[1]
+        # The jump table narrows the search to ~1/65536 of the file
+        lo, hi = struct.unpack_from("<2Q", self.mm, HEADER.size + bucket * 8)
+        mm = self.mm
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = RECORDS_START + mid * RECORD.size
+            sha1 = mm[offset:offset + 20]
+            if sha1 < target:
+                lo = mid + 1
+            elif sha1 > target:
+                hi = mid
+            else:
+                return RECORD.unpack_from(mm, offset)[1]
+        return 0
+
+    def records(self):
+        """Yield every (sha1 bytes, count) in hash order."""
+        for offset in range(RECORDS_START, RECORDS_START + self.count * RECORD.size, RECORD.size):
+            yield RECORD.unpack_from(self.mm, offset)
+
+    def close(self):
+        self.mm.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,35 +1,74 @@
 # simple_login.py
-# A very simple login system using a text file for user storage.
+# A very simple login system using an SQLite database for user storage.
+# Users from the old users.txt file are imported the first time it runs.
 
-def register_user():
+import os
+import sqlite3
+
+DB_FILE = "users.db"
+USERS_FILE = "users.txt"  # old one-line-per-user format, migrated into DB_FILE
+
+
+def open_db():
+    """Open the user database, creating it and migrating users.txt if needed."""
+    conn = sqlite3.connect(DB_FILE)
+    # PRIMARY KEY gives a unique index: lookups are O(log n) and duplicates are rejected
+    conn.execute("CREATE TABLE IF NOT EXISTS users (username TEXT PRIMARY KEY, password TEXT NOT NULL)")
+    conn.execute("CREATE TABLE IF NOT EXISTS migrations (name TEXT PRIMARY KEY)")
+    migrate_users_txt(conn)
+    return conn
+
+
+def migrate_users_txt(conn):
+    """Copy users.txt into the database once. The first entry for a username wins."""
+    done = conn.execute("SELECT 1 FROM migrations WHERE name = ?", (USERS_FILE,)).fetchone()
+    if done or not os.path.exists(USERS_FILE):
+        return
+
+    with open(USERS_FILE, "r") as f:
+        rows = [line.rstrip("\n").split(",", 1) for line in f if "," in line]
+    with conn:
+        before = conn.total_changes
+        conn.executemany("INSERT OR IGNORE INTO users (username, password) VALUES (?, ?)", rows)
+        imported = conn.total_changes - before
+        conn.execute("INSERT INTO migrations (name) VALUES (?)", (USERS_FILE,))
+
+    print(f"📦 Imported {imported} users from {USERS_FILE}", end="")
+    if imported < len(rows):
+        print(f" ({len(rows) - imported} duplicate usernames skipped)", end="")
+    print(".\n")
+
+
+def register_user(conn):
     """Register a new username and password."""
     username = input("Choose a username: ")
     password = input("Choose a password: ")
 
-    with open("users.txt", "a") as f:
-        f.write(f"{username},{password}\n")
+    try:
+        with conn:
+            conn.execute("INSERT INTO users (username, password) VALUES (?, ?)", (username, password))
+    except sqlite3.IntegrityError:
+        print("⚠️  That username is already taken.\n")
+        return
 
     print("✅ User registered successfully!\n")
 
 
-def login_user():
+def login_user(conn):
     """Check username and password against saved users."""
     username = input("Username: ")
     password = input("Password: ")
 
-    try:
-        with open("users.txt", "r") as f:
-            for line in f:
-                saved_user, saved_pass = line.strip().split(",")
-                if username == saved_user and password == saved_pass:
-                    print("✅ Login successful!\n")
-                    return
+    row = conn.execute("SELECT password FROM users WHERE username = ?", (username,)).fetchone()
+    if row and password == row[0]:
+        print("✅ Login successful!\n")
+    else:
         print("❌ Invalid username or password.\n")
-    except FileNotFoundError:
-        print("⚠️  No users registered yet. Try registering first.\n")
 
 
 # ---- Main menu ----
+conn = open_db()
+
 while True:
     print("=== Simple Login System ===")
     print("1. Register")
@@ -39,11 +78,12 @@ while True:
     choice = input("Choose an option: ")
 
     if choice == "1":
-        register_user()
+        register_user(conn)
     elif choice == "2":
-        login_user()
+        login_user(conn)
     elif choice == "3":
         print("Goodbye!")
+        conn.close()
         break
     else:
         print("Invalid choice.\n")
@@ -1,35 +1,23 @@
 # salted_login.py
 # Secure login system with hashing, salting, and JSON storage
+# (users are kept by the shared user_store module)
 
-import hashlib
 import os
-import json
-import binascii
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from user_store import UserStore, new_password_record
 
 USERS_FILE = "users.json"
 
-def hash_password(password, salt):
-    """Combine password + salt and hash the result."""
-    return hashlib.sha256(salt + password.encode()).hexdigest()
+store = UserStore(USERS_FILE)
 
 def register_user():
     username = input("Choose a username: ")
     password = input("Choose a password: ")
 
-    # Generate 16 random bytes for salt
-    salt = os.urandom(16)
-    hashed_pw = hash_password(password, salt)
-    salt_hex = binascii.hexlify(salt).decode()
-
-    users = {}
-    if os.path.exists(USERS_FILE):
-        with open(USERS_FILE, "r") as f:
-            users = json.load(f)
-
-    users[username] = {"salt": salt_hex, "hash": hashed_pw}
-
-    with open(USERS_FILE, "w") as f:
-        json.dump(users, f, indent=4)
+    if not store.add(username, new_password_record(password, store.kdf)):
+        print("⚠️ User already exists.\n")
+        return
 
     print("✅ User registered securely!\n")
 
@@ -37,21 +25,12 @@ def login_user():
     username = input("Username: ")
     password = input("Password: ")
 
-    if not os.path.exists(USERS_FILE):
-        print("⚠️  No users found. Please register first.\n")
-        return
-
-    with open(USERS_FILE, "r") as f:
-        users = json.load(f)
-
-    if username not in users:
+    user = store.get(username)
+    if user is None:
         print("❌ User not found.\n")
         return
 
-    salt = binascii.unhexlify(users[username]["salt"])
-    saved_hash = users[username]["hash"]
-
-    if hash_password(password, salt) == saved_hash:
+    if store.verify(username, user, password):
         print("✅ Login successful!\n")
     else:
         print("❌ Incorrect password.\n")
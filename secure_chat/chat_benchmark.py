@@ -0,0 +1,159 @@
+# chat_benchmark.py - Load generator for the secure chat server
+# Starts the server locally, runs N concurrent clients sending M messages each,
+# and reports throughput, round-trip latency and where the CPU time went.
+
+import json
+import time
+import random
+import asyncio
+import argparse
+import statistics
+import multiprocessing
+from cryptography.fernet import Fernet
+import server
+from protocol import HELLO, pack_message, read_frame, unpack_message, write_frame
+
+BENCH_PORT = 5099
+
+class TimedFernet(Fernet):
+    """Fernet that adds up the CPU time spent in encrypt() and decrypt()."""
+    encrypt_time = 0.0
+    decrypt_time = 0.0
+
+    def encrypt(self, data):
+        start = time.thread_time()
+        token = super().encrypt(data)
+        TimedFernet.encrypt_time += time.thread_time() - start
+        return token
+
+    def decrypt(self, token, ttl=None):
+        start = time.thread_time()
+        data = super().decrypt(token, ttl)
+        TimedFernet.decrypt_time += time.thread_time() - start
+        return data
+
+# -------------------------------
+# Server side (runs in its own process)
+# -------------------------------
+def run_server(port, conn):
+    """Run the real chat server quietly, then report its CPU split when told to stop."""
+    server.VERBOSE = False
+    server.Fernet = TimedFernet
+
+    async def serve():
+        stop = asyncio.Event()
+        asyncio.get_running_loop().add_reader(conn.fileno(), stop.set)
+        srv = await asyncio.start_server(server.handle_client, server.HOST, port, backlog=4096)
+        conn.send("ready")
+        cpu_start = time.process_time()
+        await stop.wait()
+        cpu_total = time.process_time() - cpu_start
+        srv.close()
+        conn.recv()  # consume the stop message
+        conn.send((cpu_total, TimedFernet.encrypt_time, TimedFernet.decrypt_time))
+
+    asyncio.run(serve())
+
+# -------------------------------
+# Client side
+# -------------------------------
+def make_payload(size):
+    """Log-like text, so compression sees something closer to real chat pastes."""
+    rng = random.Random(size)
+    lines = []
+    while sum(map(len, lines)) < size:
+        lines.append(f"2026-10-18 12:{rng.randrange(60):02d}:{rng.randrange(60):02d} "
+                     f"INFO worker-{rng.randrange(16)} handled request {rng.randrange(10**6)} "
+                     f"in {rng.random() * 100:.2f} ms\n")
+    return "".join(lines).encode()[:size]
+
+async def run_client(port, messages, payload, latencies, pipeline, compression):
+    reader, writer = await asyncio.open_connection(server.HOST, port)
+    write_frame(writer, json.dumps({"compression": compression}).encode(), kind=HELLO)
+    _, handshake = await read_frame(reader)
+    handshake = json.loads(handshake)
+    fernet = TimedFernet(handshake["key"].encode())
+    codec = handshake["compression"]
+
+    if pipeline:
+        # Full duplex: stream every message, read the replies as they come back
+        sent_at = []
+
+        async def send_all():
+            for _ in range(messages):
+                sent_at.append(time.perf_counter())
+                write_frame(writer, fernet.encrypt(pack_message(payload, codec)))
+                await writer.drain()
+
+        sender = asyncio.create_task(send_all())
+        for i in range(messages):
+            _, reply = await read_frame(reader)
+            unpack_message(fernet.decrypt(reply))
+            latencies.append(time.perf_counter() - sent_at[i])
+        await sender
+    else:
+        for _ in range(messages):
+            start = time.perf_counter()
+            write_frame(writer, fernet.encrypt(pack_message(payload, codec)))
+            await writer.drain()
+            _, reply = await read_frame(reader)
+            unpack_message(fernet.decrypt(reply))
+            latencies.append(time.perf_counter() - start)
+    writer.close()
+    await writer.wait_closed()
+
+async def run_clients(port, clients, messages, size, pipeline=False, compression=()):
+    payload = make_payload(size)
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(run_client(port, messages, payload, latencies, pipeline, list(compression))
+                           for _ in range(clients)))
+    return time.perf_counter() - start, latencies
+
+def print_cpu_split(name, total, encrypt, decrypt):
+    other = max(0.0, total - encrypt - decrypt)
+    print(f"{name:<8} {total:>8.2f}s total | encrypt {encrypt:.2f}s | decrypt {decrypt:.2f}s "
+          f"| socket I/O + other {other:.2f}s")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the secure chat server.")
+    parser.add_argument("-n", "--clients", type=int, default=100, help="concurrent clients")
+    parser.add_argument("-m", "--messages", type=int, default=100, help="messages per client")
+    parser.add_argument("-s", "--size", type=int, default=256, help="message size in bytes")
+    parser.add_argument("-p", "--port", type=int, default=BENCH_PORT)
+    parser.add_argument("--pipeline", action="store_true",
+                        help="send without waiting for each reply (full duplex)")
+    parser.add_argument("--compress", choices=["zlib-fast", "zlib"],
+                        help="offer this compression codec in the handshake")
+    args = parser.parse_args()
+
+    parent_conn, child_conn = multiprocessing.Pipe()
+    proc = multiprocessing.Process(target=run_server, args=(args.port, child_conn))
+    proc.start()
+    parent_conn.recv()  # wait until the server is listening
+
+    cpu_start = time.process_time()
+    elapsed, latencies = asyncio.run(run_clients(args.port, args.clients, args.messages, args.size,
+                                               args.pipeline, [args.compress] if args.compress else []))
+    client_cpu = time.process_time() - cpu_start
+
+    parent_conn.send("stop")
+    server_cpu = parent_conn.recv()
+    proc.join()
+
+    total = args.clients * args.messages
+    cuts = statistics.quantiles(latencies, n=100)
+    print("=== Secure Chat Benchmark ===")
+    mode = "pipelined" if args.pipeline else "ping-pong"
+    if args.compress:
+        mode += f", {args.compress}"
+    print(f"{args.clients} clients x {args.messages} messages x {args.size} bytes ({mode})\n")
+    print(f"Throughput: {total / elapsed:,.0f} msgs/s, "
+          f"{total * args.size / elapsed / 1e6:,.2f} MB/s (payload, one way)")
+    print(f"Round trip: p50 {cuts[49] * 1000:.2f} ms | p95 {cuts[94] * 1000:.2f} ms "
+          f"| p99 {cuts[98] * 1000:.2f} ms\n")
+    print_cpu_split("Clients", client_cpu, TimedFernet.encrypt_time, TimedFernet.decrypt_time)
+    print_cpu_split("Server", *server_cpu)
+
+if __name__ == "__main__":
+    main()
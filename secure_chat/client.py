@@ -1,33 +1,83 @@
 # client.py - Secure Chat Client
+# Full-duplex asyncio client: incoming messages are shown while you type,
+# and you can send as many messages as you like without waiting for replies.
+# Type /join ROOM, /leave ROOM or @ROOM message to use chat rooms.
 
-import socket
-from cryptography.fernet import Fernet
+import json
+import asyncio
+from cryptography.fernet import Fernet, InvalidToken
+from protocol import (
+    DIRECT, HELLO, ROOM, ROOM_KEY, decode_room_payload, pack_message, read_frame, stdin_lines,
+    unpack_message, write_frame,
+)
 
 HOST = "127.0.0.1"
 PORT = 5001
+COMPRESSION = ["zlib-fast", "zlib"]  # codecs we accept, best first ([] = never compress)
 
-client = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-client.connect((HOST, PORT))
-print("✅ Connected to server.")
+async def receive_loop(reader, fernet, room_keys):
+    """Receive, decrypt and display frames until the connection closes."""
+    while True:
+        kind, payload = await read_frame(reader)
+        if payload is None:
+            print("⚠️ Server closed the connection.")
+            return
+        try:
+            if kind == ROOM:
+                room, token = decode_room_payload(payload)
+                if room in room_keys:
+                    print(unpack_message(room_keys[room].decrypt(token)).decode())
+            elif kind == ROOM_KEY:
+                info = json.loads(unpack_message(fernet.decrypt(payload)))
+                room_keys[info["room"]] = Fernet(info["key"].encode())
+            elif kind == DIRECT:
+                print(f"Server: {unpack_message(fernet.decrypt(payload)).decode()}")
+        except (InvalidToken, ValueError):
+            print("⚠️ Message could not be decrypted.")
+            return
 
-# Receive encryption key
-key = client.recv(4096)
-fernet = Fernet(key)
+async def send_loop(writer, fernet, compression):
+    """Encrypt and send every typed line; drain only once the backlog is sent."""
+    lines = stdin_lines()
+    while True:
+        msg = await lines.get()
+        if msg is None:
+            return
+        write_frame(writer, fernet.encrypt(pack_message(msg.encode(), compression)))
+        if lines.empty():
+            await writer.drain()
 
-while True:
-    msg = input("You: ")
-    enc_msg = fernet.encrypt(msg.encode())
-    client.send(enc_msg)
+async def main():
+    reader, writer = await asyncio.open_connection(HOST, PORT)
+    print("✅ Connected to server. Type messages and press Enter (Ctrl+D to quit).")
 
-    enc_reply = client.recv(4096)
-    if not enc_reply:
-        break
+    # Offer compression, then receive the encryption key and the server's choice
+    write_frame(writer, json.dumps({"compression": COMPRESSION}).encode(), kind=HELLO)
+    _, handshake = await read_frame(reader)
+    handshake = json.loads(handshake)
+    fernet = Fernet(handshake["key"].encode())
+    compression = handshake["compression"]
+    room_keys = {}  # room name -> Fernet for that room
 
-    try:
-        reply = fernet.decrypt(enc_reply).decode()
-        print(f"Server: {reply}")
-    except Exception:
-        print("⚠️ Message could not be decrypted.")
-        break
+    receiving = asyncio.create_task(receive_loop(reader, fernet, room_keys))
+    sending = asyncio.create_task(send_loop(writer, fernet, compression))
+    done, pending = await asyncio.wait({receiving, sending}, return_when=asyncio.FIRST_COMPLETED)
+
+    if sending in done:
+        # Out of input: give the server a moment to answer what we just sent
+        try:
+            await asyncio.wait_for(receiving, timeout=1)
+        except asyncio.TimeoutError:
+            pass
+    for task in pending:
+        task.cancel()
 
-client.close()
+    writer.close()
+    await writer.wait_closed()
+    print("Goodbye!")
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("\nGoodbye!")
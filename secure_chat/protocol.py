@@ -0,0 +1,126 @@
+# protocol.py - Wire format and helpers shared by the chat server and client
+# Every message is sent as a frame: a 4-byte big-endian length, a 1-byte kind,
+# then the payload.
+
+import sys
+import zlib
+import asyncio
+import struct
+import threading
+
+HEADER = struct.Struct("!IB")
+MAX_FRAME_SIZE = 16 * 1024 * 1024  # refuse anything bigger than 16 MiB
+
+# Frame kinds
+HELLO = 4     # handshake: JSON {"compression": [codecs the client accepts]}
+KEY = 0       # handshake: JSON {"key": session key, "compression": chosen codec or null}
+DIRECT = 1    # payload is a token under the client's session key
+ROOM_KEY = 2  # session token holding JSON {"room": ..., "key": ...}
+ROOM = 3      # 1-byte room name length, room name, token under the room key
+
+def encode_frame(kind, payload):
+    """Return one complete frame as bytes (used when the same frame goes to many peers)."""
+    if len(payload) > MAX_FRAME_SIZE:
+        raise ValueError(f"Frame of {len(payload)} bytes is over the {MAX_FRAME_SIZE} byte limit.")
+    return HEADER.pack(len(payload), kind) + payload
+
+def write_frame(writer, payload, kind=DIRECT):
+    """Queue one frame on an asyncio StreamWriter (call drain() afterwards)."""
+    if len(payload) > MAX_FRAME_SIZE:
+        raise ValueError(f"Frame of {len(payload)} bytes is over the {MAX_FRAME_SIZE} byte limit.")
+    # Two writes instead of header + payload, so a big payload is never copied
+    writer.write(HEADER.pack(len(payload), kind))
+    writer.write(payload)
+
+async def read_frame(reader, max_size=MAX_FRAME_SIZE):
+    """Read one whole frame from an asyncio StreamReader and return (kind, payload).
+
+    Returns (None, None) when the connection closes cleanly between frames.
+    Frames split across TCP segments are reassembled, and frames that
+    arrive together are returned one at a time.
+    """
+    try:
+        header = await reader.readexactly(HEADER.size)
+    except asyncio.IncompleteReadError as e:
+        if not e.partial:
+            return None, None
+        raise
+    length, kind = HEADER.unpack(header)
+    if length > max_size:
+        raise ValueError(f"Peer sent a {length} byte frame, over the {max_size} byte limit.")
+    return kind, await reader.readexactly(length)
+
+# -------------------------------
+# Compression (applied before encryption)
+# -------------------------------
+# Every decrypted message starts with a flag byte saying how the rest is stored.
+RAW = 0
+ZLIB = 1
+COMPRESSION_LEVELS = {"zlib-fast": 1, "zlib": 6}  # codec name -> zlib level
+COMPRESS_MIN_SIZE = 512  # smaller messages gain nothing and just cost CPU
+
+def choose_compression(offered):
+    """Pick the first codec the client offered that we also support.
+
+    Raises ValueError if offered is not a list of codec names.
+    """
+    if not isinstance(offered, list):
+        raise ValueError("compression must be a list of codec names")
+    for name in offered:
+        if isinstance(name, str) and name in COMPRESSION_LEVELS:
+            return name
+    return None
+
+def pack_message(data, codec=None):
+    """Prefix data with its flag byte, compressing it when that actually helps."""
+    if codec is not None and len(data) >= COMPRESS_MIN_SIZE:
+        compressed = zlib.compress(data, COMPRESSION_LEVELS[codec])
+        if len(compressed) < len(data):
+            return bytes([ZLIB]) + compressed
+    return bytes([RAW]) + data
+
+def unpack_message(plaintext):
+    """Undo pack_message. Raises ValueError for malformed or oversized messages."""
+    if not plaintext:
+        raise ValueError("Empty message.")
+    if plaintext[0] == ZLIB:
+        decompressor = zlib.decompressobj()
+        try:
+            data = decompressor.decompress(plaintext[1:], MAX_FRAME_SIZE)
+        except zlib.error as e:
+            raise ValueError(f"Bad compressed message: {e}")
+        if decompressor.unconsumed_tail:
+            raise ValueError("Compressed message expands past the frame size limit.")
+        if not decompressor.eof:
+            raise ValueError("Compressed message is truncated.")
+        return data
+    if plaintext[0] != RAW:
+        raise ValueError(f"Unknown message flag {plaintext[0]}.")
+    return plaintext[1:]
+
+def encode_room_payload(room, token):
+    name = room.encode()
+    return bytes([len(name)]) + name + token
+
+def decode_room_payload(payload):
+    """Split a ROOM payload into (room name, token)."""
+    length = payload[0]
+    return payload[1:1 + length].decode(), payload[1 + length:]
+
+def stdin_lines():
+    """Return an asyncio.Queue that receives every line typed on stdin.
+
+    A single background thread does the blocking reads, so the event loop
+    keeps sending and receiving while the user is typing. None is queued
+    at end of input.
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+
+    def read_lines():
+        for line in sys.stdin:
+            loop.call_soon_threadsafe(queue.put_nowait, line.rstrip("\n"))
+        loop.call_soon_threadsafe(queue.put_nowait, None)
+
+    threading.Thread(target=read_lines, daemon=True).start()
+    return queue
@@ -1,46 +1,229 @@
 # server.py - Secure Chat Server
+# asyncio server: thousands of clients at once, each with its own Fernet session.
+# Clients can join named rooms; a room message is encrypted once under the room
+# key and the same bytes are queued for every member.
+#
+# Commands sent by clients:
+#   /join ROOM      join (or create) a room and receive its key
+#   /leave ROOM     leave a room
+#   @ROOM message   post to a room
+#   anything else   echoed back (used by chat_benchmark.py)
+#
+# Compression is negotiated in the handshake: the client's HELLO lists the
+# codecs it accepts and the server's KEY frame names the one to use.
+#
+# Lines typed into the server console are sent to every client
+# (or to one room with @ROOM message) without pausing the server.
 
-import socket
-from cryptography.fernet import Fernet
+import json
+import asyncio
+from cryptography.fernet import Fernet, InvalidToken
+from protocol import (
+    DIRECT, HELLO, KEY, ROOM, ROOM_KEY, choose_compression, encode_frame, encode_room_payload,
+    pack_message, read_frame, stdin_lines, unpack_message,
+)
 
 HOST = "127.0.0.1"
 PORT = 5001
+VERBOSE = True          # print every message (turned off by the benchmark)
+WRITE_QUEUE_LIMIT = 1000  # frames a client may fall behind before it is dropped
 
-# Load or generate encryption key
-key = Fernet.generate_key()
-fernet = Fernet(key)
+sessions = {}  # peer address -> Session for every connected client
+rooms = {}     # room name -> Room
 
-print("🔐 Secure Chat Server started.")
-print("Waiting for connection...")
+class Session:
+    """One connected client: its key, rooms and outgoing frame queue."""
 
-# Start server
-server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-server.bind((HOST, PORT))
-server.listen(1)
+    def __init__(self, addr, writer, compression=None):
+        self.addr = addr
+        self.writer = writer
+        self.compression = compression
+        self.key = Fernet.generate_key()
+        self.fernet = Fernet(self.key)
+        self.rooms = set()
+        self.queue = asyncio.Queue(maxsize=WRITE_QUEUE_LIMIT)
+        self.closed = False  # set once the client has been dropped
 
-conn, addr = server.accept()
-print(f"✅ Connected with {addr}")
+    def send(self, frame):
+        """Queue a ready-made frame. A client that can't keep up is disconnected
+        instead of making everyone else wait for it."""
+        if self.closed:
+            return
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            self.closed = True
+            print(f"⚠️ {self.addr} is too slow, disconnecting.")
+            self.writer.transport.abort()
 
-# Send key to client
-conn.send(key)
+    def send_direct(self, text, kind=DIRECT):
+        token = self.fernet.encrypt(pack_message(text.encode(), self.compression))
+        self.send(encode_frame(kind, token))
 
-while True:
-    # Receive encrypted message
-    enc_message = conn.recv(4096)
-    if not enc_message:
-        break
+    async def write_loop(self):
+        """Write queued frames; only wait on the socket once the queue is empty."""
+        try:
+            while True:
+                frame = await self.queue.get()
+                self.writer.write(frame)
+                if self.queue.empty():
+                    await self.writer.drain()
+        except ConnectionError:
+            pass
 
+class Room:
+    def __init__(self, name):
+        self.name = name
+        self.key = Fernet.generate_key()
+        self.fernet = Fernet(self.key)
+        self.members = set()
+
+    def broadcast(self, text, sender=None):
+        """Encrypt once, then hand the very same frame bytes to every member.
+
+        Members that negotiated different compression get a frame built
+        for their codec, so that is at most one encryption per codec.
+        """
+        data = text.encode()
+        frames = {}
+        for member in self.members:
+            if member is sender:
+                continue
+            frame = frames.get(member.compression)
+            if frame is None:
+                token = self.fernet.encrypt(pack_message(data, member.compression))
+                frame = frames[member.compression] = encode_frame(ROOM, encode_room_payload(self.name, token))
+            member.send(frame)
+
+# -------------------------------
+# Room commands
+# -------------------------------
+def join_room(session, name):
+    if not name or len(name.encode()) > 255:
+        session.send_direct("⚠️ Room names must be 1-255 bytes.")
+        return
+    room = rooms.get(name)
+    if room is None:
+        room = rooms[name] = Room(name)
+    room.members.add(session)
+    session.rooms.add(name)
+    session.send_direct(json.dumps({"room": name, "key": room.key.decode()}), kind=ROOM_KEY)
+    session.send_direct(f"✅ Joined #{name} ({len(room.members)} members)")
+
+def leave_room(session, name, reply=True):
+    room = rooms.get(name)
+    if room is None or session not in room.members:
+        if reply:
+            session.send_direct(f"⚠️ You are not in #{name}.")
+        return
+    room.members.discard(session)
+    session.rooms.discard(name)
+    if not room.members:
+        del rooms[name]
+    if reply:
+        session.send_direct(f"👋 Left #{name}")
+
+def post_to_room(session, name, text):
+    room = rooms.get(name)
+    if room is None or session not in room.members:
+        session.send_direct(f"⚠️ Join #{name} before posting to it.")
+        return
+    room.broadcast(f"[#{name}] {session.addr[0]}:{session.addr[1]}: {text}", sender=session)
+    session.send_direct(f"📨 Sent to {len(room.members) - 1} other members of #{name}")
+
+def handle_message(session, message):
+    if message.startswith("/join "):
+        join_room(session, message[6:].strip())
+    elif message.startswith("/leave "):
+        leave_room(session, message[7:].strip())
+    elif message.startswith("@") and " " in message:
+        name, text = message[1:].split(" ", 1)
+        post_to_room(session, name, text)
+    else:
+        session.send_direct(f"Received: {message}")
+
+async def handle_client(reader, writer):
+    """Run one client's session: send it a fresh key, then serve its messages."""
+    addr = writer.get_extra_info("peername")
+
+    # The client opens with HELLO listing the compression codecs it accepts
+    try:
+        kind, hello = await read_frame(reader)
+        if kind != HELLO:
+            raise ValueError("expected HELLO")
+        compression = choose_compression(json.loads(hello).get("compression", []))
+    except (ConnectionError, asyncio.IncompleteReadError, ValueError, AttributeError):
+        print(f"⚠️ {addr} sent a bad handshake.")
+        writer.close()
+        return
+
+    # Every client gets its own encryption key
+    session = Session(addr, writer, compression)
+    sessions[addr] = session
+    if VERBOSE:
+        print(f"✅ Connected with {addr} ({len(sessions)} online, compression: {compression})")
+
+    # Send key to client along with the chosen compression
+    handshake = {"key": session.key.decode(), "compression": compression}
+    writer.write(encode_frame(KEY, json.dumps(handshake).encode()))
+    write_task = asyncio.create_task(session.write_loop())
+    try:
+        while True:
+            # Receive encrypted message
+            kind, enc_message = await read_frame(reader)
+            if enc_message is None:
+                break
+
+            try:
+                message = unpack_message(session.fernet.decrypt(enc_message)).decode()
+                if VERBOSE:
+                    print(f"{addr}: {message}")
+            except InvalidToken:
+                print(f"⚠️ Decryption failed for {addr}.")
+                break
+
+            handle_message(session, message)
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    except ValueError as e:
+        print(f"⚠️ {addr}: {e}")
+    finally:
+        for name in list(session.rooms):
+            leave_room(session, name, reply=False)
+        del sessions[addr]
+        write_task.cancel()
+        writer.close()
+        if VERBOSE:
+            print(f"👋 {addr} disconnected ({len(sessions)} online)")
+
+async def console_loop():
+    """Send lines typed on the server console while clients keep being served."""
+    lines = stdin_lines()
+    while True:
+        line = await lines.get()
+        if line is None:
+            return
+        if line.startswith("@") and " " in line:
+            name, text = line[1:].split(" ", 1)
+            if name in rooms:
+                rooms[name].broadcast(f"[#{name}] Server: {text}")
+            else:
+                print(f"⚠️ No room called #{name}.")
+        elif line:
+            for session in sessions.values():
+                session.send_direct(f"📢 {line}")
+
+async def main(host=HOST, port=PORT):
+    server = await asyncio.start_server(handle_client, host, port, backlog=4096)
+    print("🔐 Secure Chat Server started.")
+    print(f"Listening on {host}:{port}... (type to message everyone)")
+    console = asyncio.create_task(console_loop())
+    async with server:
+        await server.serve_forever()
+    console.cancel()
+
+if __name__ == "__main__":
     try:
-        message = fernet.decrypt(enc_message).decode()
-        print(f"Client: {message}")
-    except Exception:
-        print("⚠️ Decryption failed.")
-        break
-
-    # Send response
-    reply = input("You: ")
-    enc_reply = fernet.encrypt(reply.encode())
-    conn.send(enc_reply)
-
-conn.close()
-server.close()
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("\nServer stopped.")
@@ -1,35 +1,69 @@
+import os
+import sqlite3
 import hashlib
 
+DB_FILE = "users.db"
+USERS_FILE = "users.txt"  # old "username,hash" lines, migrated into DB_FILE
+
 def hash_password(password):
     """Return a SHA256 hash of the given password."""
     return hashlib.sha256(password.encode()).hexdigest()
 
-def register_user():
+def open_db():
+    """Open the user database, creating it and migrating users.txt if needed."""
+    conn = sqlite3.connect(DB_FILE)
+    # PRIMARY KEY gives a unique index: lookups are O(log n) and duplicates are rejected
+    conn.execute("CREATE TABLE IF NOT EXISTS users (username TEXT PRIMARY KEY, hash TEXT NOT NULL)")
+    conn.execute("CREATE TABLE IF NOT EXISTS migrations (name TEXT PRIMARY KEY)")
+    migrate_users_txt(conn)
+    return conn
+
+def migrate_users_txt(conn):
+    """Copy users.txt into the database once. The first entry for a username wins."""
+    done = conn.execute("SELECT 1 FROM migrations WHERE name = ?", (USERS_FILE,)).fetchone()
+    if done or not os.path.exists(USERS_FILE):
+        return
+
+    with open(USERS_FILE, "r") as f:
+        rows = [line.strip().split(",", 1) for line in f if "," in line]
+    with conn:
+        before = conn.total_changes
+        conn.executemany("INSERT OR IGNORE INTO users (username, hash) VALUES (?, ?)", rows)
+        imported = conn.total_changes - before
+        conn.execute("INSERT INTO migrations (name) VALUES (?)", (USERS_FILE,))
+
+    print(f"📦 Imported {imported} users from {USERS_FILE}", end="")
+    if imported < len(rows):
+        print(f" ({len(rows) - imported} duplicate usernames skipped)", end="")
+    print(".\n")
+
+def register_user(conn):
     username = input("Choose a username: ")
     password = input("Choose a password: ")
     hashed_pw = hash_password(password)
 
-    with open("users.txt", "a") as f:
-        f.write(f"{username},{hashed_pw}\n")
+    try:
+        with conn:
+            conn.execute("INSERT INTO users (username, hash) VALUES (?, ?)", (username, hashed_pw))
+    except sqlite3.IntegrityError:
+        print("⚠️ That username is already taken.\n")
+        return
     print("✅ User registered successfully!\n")
 
-def login_user():
+def login_user(conn):
     username = input("Username: ")
     password = input("Password: ")
     hashed_pw = hash_password(password)
 
-    try:
-        with open("users.txt", "r") as f:
-            for line in f:
-                saved_user, saved_hash = line.strip().split(",")
-                if username == saved_user and hashed_pw == saved_hash:
-                    print("✅ Login successful!\n")
-                    return
+    row = conn.execute("SELECT hash FROM users WHERE username = ?", (username,)).fetchone()
+    if row and hashed_pw == row[0]:
+        print("✅ Login successful!\n")
+    else:
         print("❌ Invalid username or password.\n")
-    except FileNotFoundError:
-        print("⚠️ No users registered yet.\n")
 
 # ---- Menu ----
+conn = open_db()
+
 while True:
     print("=== Secure Login System ===")
     print("1. Register")
@@ -39,11 +73,12 @@ while True:
     choice = input("Choose an option: ")
 
     if choice == "1":
-        register_user()
+        register_user(conn)
     elif choice == "2":
-        login_user()
+        login_user(conn)
     elif choice == "3":
         print("Goodbye!")
+        conn.close()
         break
     else:
         print("Invalid choice.\n")
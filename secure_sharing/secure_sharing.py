@@ -3,21 +3,20 @@
 
 import os
 import json
-import hashlib
-import binascii
 from datetime import datetime
 from cryptography.fernet import Fernet
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from user_store import UserStore, new_password_record
 
 USERS_FILE = "users.json"
 LOG_FILE = "access_log.json"
 
+store = UserStore(USERS_FILE)
+
 # -----------------------------
 # Utility Functions
 # -----------------------------
-def hash_password(password, salt):
-    """Combine salt + password and return SHA256 hash."""
-    return hashlib.sha256(salt + password.encode()).hexdigest()
-
 def log_event(username, action, filename):
     """Log user actions to access_log.json."""
     event = {
@@ -44,47 +43,25 @@ def register_user():
     username = input("Choose a username: ")
     password = input("Choose a password: ")
 
-    salt = os.urandom(16)
-    hashed_pw = hash_password(password, salt)
-    salt_hex = binascii.hexlify(salt).decode()
-    key = Fernet.generate_key().decode()
-
-    users = {}
-    if os.path.exists(USERS_FILE):
-        with open(USERS_FILE, "r") as f:
-            users = json.load(f)
+    record = new_password_record(password, store.kdf)
+    record["key"] = Fernet.generate_key().decode()
 
-    if username in users:
+    if not store.add(username, record):
         print("⚠️ User already exists.\n")
         return
 
-    users[username] = {"salt": salt_hex, "hash": hashed_pw, "key": key}
-
-    with open(USERS_FILE, "w") as f:
-        json.dump(users, f, indent=4)
-
     print(f"✅ User '{username}' registered successfully.\n")
 
 def login_user():
     username = input("Username: ")
     password = input("Password: ")
 
-    if not os.path.exists(USERS_FILE):
-        print("⚠️ No users found.\n")
-        return None
-
-    with open(USERS_FILE, "r") as f:
-        users = json.load(f)
-
-    if username not in users:
+    user_data = store.get(username)
+    if user_data is None:
         print("❌ User not found.\n")
         return None
 
-    user_data = users[username]
-    salt = binascii.unhexlify(user_data["salt"])
-    hashed_pw = hash_password(password, salt)
-
-    if hashed_pw == user_data["hash"]:
+    if store.verify(username, user_data, password):
         print("✅ Login successful!\n")
         return username, Fernet(user_data["key"].encode())
     else:
@@ -142,15 +119,13 @@ def share_file(sender, recipient):
         print("⚠️ File not found.\n")
         return
 
-    with open(USERS_FILE, "r") as f:
-        users = json.load(f)
-
-    if recipient not in users:
+    recipient_data = store.get(recipient)
+    if recipient_data is None:
         print("❌ Recipient not found.\n")
         return
 
-    sender_key = users[sender]["key"]
-    recipient_key = users[recipient]["key"]
+    sender_key = store.get(sender)["key"]
+    recipient_key = recipient_data["key"]
 
     # Just record the intent of sharing for now
     log_event(sender, f"shared {filename} with {recipient}", filename)
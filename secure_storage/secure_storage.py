@@ -1,66 +1,41 @@
 # secure_storage.py
 # Multi-user encrypted file storage system
+# (users are kept by the shared user_store module)
 
 import os
-import json
-import hashlib
-import binascii
 from cryptography.fernet import Fernet
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from user_store import UserStore, new_password_record
 
 USERS_FILE = "users.json"
 
-def hash_password(password, salt):
-    """Combine salt + password and return SHA256 hash."""
-    return hashlib.sha256(salt + password.encode()).hexdigest()
+store = UserStore(USERS_FILE)
 
 def register_user():
     username = input("Choose a username: ")
     password = input("Choose a password: ")
 
-    # Generate salt
-    salt = os.urandom(16)
-    hashed_pw = hash_password(password, salt)
-    salt_hex = binascii.hexlify(salt).decode()
-
-    users = {}
-    if os.path.exists(USERS_FILE):
-        with open(USERS_FILE, "r") as f:
-            users = json.load(f)
+    record = new_password_record(password, store.kdf)
+    # Generate unique encryption key for this user
+    record["key"] = Fernet.generate_key().decode()
 
-    if username in users:
+    if not store.add(username, record):
         print("⚠️ User already exists.\n")
         return
 
-    # Generate unique encryption key for this user
-    key = Fernet.generate_key().decode()
-
-    users[username] = {"salt": salt_hex, "hash": hashed_pw, "key": key}
-
-    with open(USERS_FILE, "w") as f:
-        json.dump(users, f, indent=4)
-
     print(f"✅ User '{username}' registered successfully.\n")
 
 def login_user():
     username = input("Username: ")
     password = input("Password: ")
 
-    if not os.path.exists(USERS_FILE):
-        print("⚠️ No users found. Please register first.\n")
-        return None
-
-    with open(USERS_FILE, "r") as f:
-        users = json.load(f)
-
-    if username not in users:
+    user_data = store.get(username)
+    if user_data is None:
         print("❌ User not found.\n")
         return None
 
-    user_data = users[username]
-    salt = binascii.unhexlify(user_data["salt"])
-    hashed_pw = hash_password(password, salt)
-
-    if hashed_pw == user_data["hash"]:
+    if store.verify(username, user_data, password):
         print("✅ Login successful!\n")
         return username, Fernet(user_data["key"].encode())
     else:
@@ -0,0 +1,98 @@
+# duplicate_finder.py
+# Finds duplicate files without hashing everything:
+# size buckets -> hash of first/last 64 KiB -> full hash of what is left.
+
+import os
+import json
+import hashlib
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from file_integrity_checker import hash_paths, walk_entries
+
+EDGE_SIZE = 64 * 1024
+DUPLICATES_FILE = "duplicates.json"
+
+def partial_hash(path):
+    """Hash the first and last 64 KiB of a file. Returns (path, digest or None)."""
+    try:
+        with open(path, "rb") as f:
+            hasher = hashlib.sha256(f.read(EDGE_SIZE))
+            size = os.fstat(f.fileno()).st_size
+            if size > EDGE_SIZE:
+                f.seek(max(EDGE_SIZE, size - EDGE_SIZE))
+                hasher.update(f.read(EDGE_SIZE))
+    except OSError:
+        return path, None
+    return path, hasher.hexdigest()
+
+def group_by_size(directory, include_empty=False):
+    """Bucket files by size, keeping only sizes shared by two or more files.
+
+    Hard links to the same inode are the same file, so only one is kept.
+    """
+    by_size = defaultdict(list)
+    seen_inodes = set()
+    for entry in walk_entries(directory):
+        try:
+            st = entry.stat(follow_symlinks=False)
+        except OSError:
+            continue
+        if st.st_size == 0 and not include_empty:
+            continue
+        inode = (st.st_dev, st.st_ino)
+        if inode in seen_inodes:
+            continue
+        seen_inodes.add(inode)
+        by_size[st.st_size].append(entry.path)
+    return {size: paths for size, paths in by_size.items() if len(paths) > 1}
+
+def find_duplicates(directory, workers=None, include_empty=False):
+    """Return a list of duplicate groups: {"size", "hash", "files"}."""
+    by_size = group_by_size(directory, include_empty)
+    sizes = {path: size for size, paths in by_size.items() for path in paths}
+
+    # Stage 2: first/last 64 KiB
+    candidates = defaultdict(list)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for path, digest in pool.map(partial_hash, list(sizes), chunksize=64):
+            if digest is not None:
+                candidates[(sizes[path], digest)].append(path)
+
+    groups = []
+    needs_full_hash = []
+    for (size, digest), paths in candidates.items():
+        if len(paths) < 2:
+            continue
+        if size <= 2 * EDGE_SIZE:
+            # The edges already covered every byte in order, so this is the full SHA256
+            groups.append({"size": size, "hash": digest, "files": sorted(paths)})
+        else:
+            needs_full_hash.extend(paths)
+
+    # Stage 3: full hash only for the files that survived both filters
+    by_hash = defaultdict(list)
+    for path, entry in hash_paths(needs_full_hash, workers).items():
+        if "hash" in entry:
+            by_hash[(sizes[path], entry["hash"])].append(path)
+    for (size, digest), paths in by_hash.items():
+        if len(paths) > 1:
+            groups.append({"size": size, "hash": digest, "files": sorted(paths)})
+
+    groups.sort(key=lambda group: group["size"] * (len(group["files"]) - 1), reverse=True)
+    return groups
+
+def main():
+    print("=== Duplicate File Finder ===")
+    directory = input("Enter the directory to scan: ")
+    output_file = input(f"Save results to [{DUPLICATES_FILE}]: ") or DUPLICATES_FILE
+
+    groups = find_duplicates(directory)
+    with open(output_file, "w") as f:
+        json.dump(groups, f, indent=4)
+
+    wasted = sum(group["size"] * (len(group["files"]) - 1) for group in groups)
+    print(f"\n🔍 Found {len(groups)} groups of duplicates ({wasted:,} bytes could be freed).")
+    print(f"✅ Results saved to '{output_file}'.\n")
+
+if __name__ == "__main__":
+    main()
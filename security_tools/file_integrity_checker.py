@@ -1,32 +1,502 @@
 # file_integrity_checker.py
-# Checks if a file has changed by comparing SHA256 hashes.
+# Checks if a file has changed by comparing SHA256 (or BLAKE2) hashes.
+# Can also baseline a whole directory tree and check it later.
 
+import os
+import mmap
+import json
+import random
 import hashlib
+import threading
+from datetime import datetime
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
 
-def get_file_hash(filename):
-    """Return the SHA256 hash of a file."""
-    hasher = hashlib.sha256()
-    with open(filename, "rb") as f:  # rb = read in binary mode
-        for chunk in iter(lambda: f.read(4096), b""):
-            hasher.update(chunk)
+MANIFEST_FILE = "baseline.json"
+CACHE_FILE = "integrity_cache.json"
+BUFFER_SIZE = 1024 * 1024          # 1 MiB reads instead of 4 KiB keeps syscalls down
+MERKLE_BLOCK_SIZE = 4 * 1024 * 1024
+BLOCKS_PER_TASK = 16               # leaves handed to a worker at once
+
+ALGORITHMS = {
+    "sha256": hashlib.sha256,
+    "blake2b": hashlib.blake2b,
+    "blake2s": hashlib.blake2s,
+}
+
+# One read buffer per size and thread, reused for every file that thread hashes
+_buffers = threading.local()
+
+def get_buffer(size):
+    if not hasattr(_buffers, "by_size"):
+        _buffers.by_size = {}
+    buffers = _buffers.by_size
+    if size not in buffers:
+        buffers[size] = bytearray(size)
+    return buffers[size]
+
+def get_file_hash(filename, algorithm="sha256", buffer_size=BUFFER_SIZE, use_mmap=False):
+    """Return the hex digest of a file (SHA256 by default).
+
+    The file is read with readinto() into a buffer reused by the calling
+    thread, so no new bytes object is allocated per chunk and threads never
+    share one. use_mmap=True hashes a mapping of the file in one update()
+    call instead; only use it on files nothing else is writing, because a
+    file truncated while mapped kills the process (SIGBUS).
+    """
+    hasher = ALGORITHMS[algorithm]()
+    with open(filename, "rb", buffering=0) as f:  # rb = read in binary mode
+        size = os.fstat(f.fileno()).st_size
+        if use_mmap and size > 0:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                hasher.update(mm)
+        else:
+            view = memoryview(get_buffer(buffer_size))
+            while True:
+                n = f.readinto(view)
+                if not n:
+                    break
+                hasher.update(view[:n])
     return hasher.hexdigest()
 
+def first_mismatch(buf_a, buf_b, length):
+    """Return the index of the first differing byte in two equal-length buffers."""
+    step = 4096
+    for start in range(0, length, step):
+        end = min(start + step, length)
+        if buf_a[start:end] != buf_b[start:end]:
+            for i in range(start, end):
+                if buf_a[i] != buf_b[i]:
+                    return i
+    return None
+
+def find_first_difference(file1, file2, buffer_size=BUFFER_SIZE):
+    """Compare two files without hashing them.
+
+    Returns (identical, offset). Files of different sizes are rejected by a
+    single stat and give offset None; otherwise both files are read in
+    lock-step and the scan stops at the first block that differs, giving
+    the offset of the first differing byte.
+    """
+    st1, st2 = os.stat(file1), os.stat(file2)
+    if os.path.samestat(st1, st2):
+        return True, None
+    if st1.st_size != st2.st_size:
+        return False, None
+
+    # Two dedicated buffers; plain bytearray == bytearray is a single memcmp
+    buf_a, buf_b = bytearray(buffer_size), bytearray(buffer_size)
+    offset = 0
+    with open(file1, "rb", buffering=0) as f1, open(file2, "rb", buffering=0) as f2:
+        while True:
+            n1 = f1.readinto(buf_a)
+            n2 = f2.readinto(buf_b)
+            if n1 != n2:
+                # Short read on one side (file changed while reading): compare what we have
+                n = min(n1, n2)
+                mismatch = first_mismatch(buf_a, buf_b, n)
+                return False, offset + (n if mismatch is None else mismatch)
+            if not n1:
+                return True, None
+            if n1 == buffer_size:
+                same = buf_a == buf_b
+            else:
+                same = buf_a[:n1] == buf_b[:n1]
+            if not same:
+                return False, offset + first_mismatch(buf_a, buf_b, n1)
+            offset += n1
+
 def compare_files(file1, file2):
     """Compare two files and print whether they're identical."""
-    hash1 = get_file_hash(file1)
-    hash2 = get_file_hash(file2)
+    identical, offset = find_first_difference(file1, file2)
 
-    print(f"\nHash of {file1}: {hash1}")
-    print(f"Hash of {file2}: {hash2}")
-
-    if hash1 == hash2:
+    if identical:
         print("\n✅ Files are identical (no change detected).")
+    elif offset is None:
+        print(f"\nSize of {file1}: {os.path.getsize(file1):,} bytes")
+        print(f"Size of {file2}: {os.path.getsize(file2):,} bytes")
+        print("\n⚠️  Files are different (possible tampering).")
     else:
+        block = offset - offset % BUFFER_SIZE
+        print(f"\nFirst difference at byte {offset:,} (in the block starting at {block:,}).")
         print("\n⚠️  Files are different (possible tampering).")
 
+# -------------------------------
+# Directory tree baselines
+# -------------------------------
+def walk_entries(directory):
+    """Yield a DirEntry for every regular file under directory.
+
+    os.scandir gets the file type from the directory listing itself, so
+    skipping symlinks and directories costs no extra stat calls.
+    """
+    try:
+        with os.scandir(directory) as it:
+            entries = sorted(it, key=lambda e: e.name)
+    except OSError:
+        return
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            yield from walk_entries(entry.path)
+        elif entry.is_file(follow_symlinks=False):
+            yield entry
+
+def walk_files(directory):
+    """Yield the path of every regular file under directory."""
+    for entry in walk_entries(directory):
+        yield entry.path
+
+def scan_file(path, algorithm="sha256"):
+    """Return (path, entry) with size, mtime and digest, or an error entry."""
+    try:
+        st = os.stat(path)
+        digest = get_file_hash(path, algorithm)
+    except OSError as e:
+        return path, {"error": str(e)}
+    return path, {"size": st.st_size, "mtime": st.st_mtime, "hash": digest}
+
+def hash_paths(paths, workers=None, algorithm="sha256"):
+    """Hash a list of files across a process pool. Returns path -> entry."""
+    results = {}
+    if not paths:
+        return results
+    # Small chunks keep all workers busy without one huge IPC round trip per file
+    chunksize = max(1, len(paths) // ((workers or os.cpu_count() or 1) * 16))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for path, entry in pool.map(partial(scan_file, algorithm=algorithm), paths, chunksize=chunksize):
+            results[path] = entry
+    return results
+
+def hash_tree(directory, workers=None, algorithm="sha256"):
+    """Hash every file under directory across a process pool.
+
+    Returns a dict of relative path -> {size, mtime, hash}.
+    """
+    results = hash_paths(list(walk_files(directory)), workers, algorithm)
+    return {os.path.relpath(path, directory): entry for path, entry in results.items()}
+
+def save_manifest(manifest, manifest_file=MANIFEST_FILE):
+    """Write a manifest atomically so a crash never leaves half a baseline."""
+    tmp_file = manifest_file + ".tmp"
+    with open(tmp_file, "w") as f:
+        json.dump(manifest, f, indent=4)
+    os.replace(tmp_file, manifest_file)
+
+def load_manifest(manifest_file=MANIFEST_FILE):
+    with open(manifest_file, "r") as f:
+        return json.load(f)
+
+def create_baseline(directory, manifest_file=MANIFEST_FILE, workers=None, algorithm="sha256"):
+    """Hash a whole tree and store the result as a baseline manifest."""
+    files = hash_tree(directory, workers, algorithm)
+    manifest = {
+        "root": os.path.abspath(directory),
+        "algorithm": algorithm,
+        "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "files": files,
+    }
+    save_manifest(manifest, manifest_file)
+    return manifest
+
+def check_baseline(manifest_file=MANIFEST_FILE, workers=None):
+    """Re-hash the baselined tree and return (modified, added, removed)."""
+    manifest = load_manifest(manifest_file)
+    old_files = manifest["files"]
+    new_files = hash_tree(manifest["root"], workers, manifest.get("algorithm", "sha256"))
+
+    modified = sorted(
+        path for path in old_files.keys() & new_files.keys()
+        if old_files[path].get("hash") != new_files[path].get("hash")
+    )
+    added = sorted(new_files.keys() - old_files.keys())
+    removed = sorted(old_files.keys() - new_files.keys())
+    return modified, added, removed
+
+# -------------------------------
+# Incremental re-scan
+# -------------------------------
+def stat_signature(st):
+    """The metadata that has to change whenever a file's content changes."""
+    return [st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, st.st_ctime_ns]
+
+def load_cache(cache_file=CACHE_FILE):
+    if not os.path.exists(cache_file):
+        return {}
+    with open(cache_file, "r") as f:
+        return json.load(f)
+
+def verify_incremental(directory, cache_file=CACHE_FILE, sample_size=0, workers=None,
+                       algorithm="sha256"):
+    """Check a tree, re-hashing only files whose stat metadata changed.
+
+    The cache remembers (device, inode, size, mtime_ns, ctime_ns) and the
+    digest of every file, so an unchanged tree costs one stat per file.
+    sample_size > 0 is the paranoid mode: that many unchanged files are
+    picked at random and re-hashed anyway to catch content edits that
+    had their timestamps forged back.
+
+    Returns (modified, added, removed, forged, unreadable). A file that
+    cannot be read stays in the cache as an error entry with its last good
+    digest, so it is re-hashed and compared against that on the next scan.
+    """
+    cache = load_cache(cache_file)
+    old_files = {}
+    if cache.get("root") == os.path.abspath(directory) and cache.get("algorithm", "sha256") == algorithm:
+        old_files = cache.get("files", {})
+
+    new_files = {}
+    to_hash = []
+    unchanged = []
+    for entry in walk_entries(directory):
+        rel = os.path.relpath(entry.path, directory)
+        try:
+            signature = stat_signature(entry.stat(follow_symlinks=False))
+        except OSError:
+            continue
+        cached = old_files.get(rel)
+        if cached and cached.get("stat") == signature and "hash" in cached and "error" not in cached:
+            new_files[rel] = cached
+            unchanged.append(rel)
+        else:
+            new_files[rel] = {"stat": signature}
+            to_hash.append(rel)
+
+    if sample_size:
+        sample = random.sample(unchanged, min(sample_size, len(unchanged)))
+    else:
+        sample = []
+
+    paths = [os.path.join(directory, rel) for rel in to_hash + sample]
+    results = hash_paths(paths, workers, algorithm)
+
+    modified, added, forged, unreadable = [], [], [], []
+    for rel in to_hash:
+        entry = results[os.path.join(directory, rel)]
+        if "hash" not in entry:
+            new_files[rel] = dict(old_files.get(rel, new_files[rel]), error=entry["error"])
+            unreadable.append(rel)
+            continue
+        new_files[rel]["hash"] = entry["hash"]
+        if rel not in old_files:
+            added.append(rel)
+        elif old_files[rel].get("hash") != entry["hash"]:
+            modified.append(rel)
+    for rel in sample:
+        entry = results[os.path.join(directory, rel)]
+        if "hash" not in entry:
+            new_files[rel] = dict(new_files[rel], error=entry["error"])
+            unreadable.append(rel)
+        elif entry["hash"] != old_files[rel]["hash"]:
+            forged.append(rel)
+            new_files[rel] = {"stat": new_files[rel]["stat"], "hash": entry["hash"]}
+
+    removed = sorted(old_files.keys() - new_files.keys())
+    save_manifest({"root": os.path.abspath(directory), "algorithm": algorithm, "files": new_files},
+                  cache_file)
+    return sorted(modified), sorted(added), removed, sorted(forged), sorted(unreadable)
+
+# -------------------------------
+# Merkle trees for huge files
+# -------------------------------
+def hash_blocks(filename, first, count, block_size, algorithm="sha256"):
+    """Hash `count` consecutive blocks starting at block number `first`."""
+    digests = []
+    with open(filename, "rb", buffering=0) as f:
+        fd = f.fileno()
+        for index in range(first, first + count):
+            data = os.pread(fd, block_size, index * block_size)
+            digests.append(ALGORITHMS[algorithm](data).hexdigest())
+    return digests
+
+def parent_hash(left, right, algorithm):
+    return ALGORITHMS[algorithm](bytes.fromhex(left) + bytes.fromhex(right)).hexdigest()
+
+def build_levels(leaves, algorithm):
+    """Build the tree bottom-up. A node without a sibling is carried up as-is."""
+    levels = [leaves]
+    while len(levels[-1]) > 1:
+        below = levels[-1]
+        above = []
+        for i in range(0, len(below), 2):
+            if i + 1 < len(below):
+                above.append(parent_hash(below[i], below[i + 1], algorithm))
+            else:
+                above.append(below[i])
+        levels.append(above)
+    return levels
+
+def build_merkle_tree(filename, block_size=MERKLE_BLOCK_SIZE, algorithm="sha256", workers=None):
+    """Split a file into fixed-size blocks and hash them into a Merkle tree.
+
+    Leaves are hashed in parallel; levels[0] holds the leaves and
+    levels[-1] the root.
+    """
+    size = os.path.getsize(filename)
+    block_count = max(1, -(-size // block_size))
+    starts = range(0, block_count, BLOCKS_PER_TASK)
+    counts = [min(BLOCKS_PER_TASK, block_count - start) for start in starts]
+
+    leaves = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for digests in pool.map(partial(hash_blocks, filename, block_size=block_size,
+                                        algorithm=algorithm), starts, counts):
+            leaves.extend(digests)
+
+    return {
+        "file": os.path.abspath(filename),
+        "size": size,
+        "block_size": block_size,
+        "algorithm": algorithm,
+        "levels": build_levels(leaves, algorithm),
+    }
+
+def update_merkle_tree(filename, tree, blocks):
+    """Re-hash only the given leaf blocks and the nodes above them.
+
+    Only valid while the file keeps its size; otherwise rebuild the tree.
+    """
+    if os.path.getsize(filename) != tree["size"]:
+        raise ValueError("File size changed, rebuild the Merkle tree instead.")
+    levels = tree["levels"]
+    algorithm = tree["algorithm"]
+    for index in blocks:
+        levels[0][index] = hash_blocks(filename, index, 1, tree["block_size"], algorithm)[0]
+
+    touched = set(blocks)
+    for depth in range(1, len(levels)):
+        below = levels[depth - 1]
+        touched = {index // 2 for index in touched}
+        for index in touched:
+            left = 2 * index
+            if left + 1 < len(below):
+                levels[depth][index] = parent_hash(below[left], below[left + 1], algorithm)
+            else:
+                levels[depth][index] = below[left]
+    return tree
+
+def diff_merkle_trees(tree_a, tree_b):
+    """Return the (start, end) byte ranges that differ between two trees.
+
+    Walks down from the root and only descends into subtrees whose hashes
+    differ, so matching regions are skipped without looking at their leaves.
+    """
+    if tree_a["block_size"] != tree_b["block_size"] or tree_a["algorithm"] != tree_b["algorithm"]:
+        raise ValueError("Trees were built with different block sizes or algorithms.")
+    block_size = tree_a["block_size"]
+    levels_a, levels_b = tree_a["levels"], tree_b["levels"]
+    total_size = max(tree_a["size"], tree_b["size"])
+
+    def node(levels, depth, index):
+        if depth < len(levels) and index < len(levels[depth]):
+            return levels[depth][index]
+        return None
+
+    changed_blocks = []
+    top = max(len(levels_a), len(levels_b)) - 1
+    stack = [(top, 0)]
+    while stack:
+        depth, index = stack.pop()
+        first_block = index << depth
+        if first_block * block_size >= total_size and first_block > 0:
+            continue
+        hash_a, hash_b = node(levels_a, depth, index), node(levels_b, depth, index)
+        if hash_a is not None and hash_a == hash_b:
+            continue
+        if depth == 0:
+            changed_blocks.append(index)
+        else:
+            stack.append((depth - 1, 2 * index + 1))
+            stack.append((depth - 1, 2 * index))
+
+    # Merge neighbouring blocks into byte ranges
+    ranges = []
+    for index in sorted(changed_blocks):
+        start, end = index * block_size, min((index + 1) * block_size, total_size)
+        if ranges and ranges[-1][1] == start:
+            ranges[-1] = (ranges[-1][0], end)
+        else:
+            ranges.append((start, end))
+    return ranges
+
+def print_report(modified, added, removed, forged=(), unreadable=()):
+    for path in forged:
+        print(f"🚨 Content changed but metadata did not: {path}")
+    for path in modified:
+        print(f"⚠️  Modified: {path}")
+    for path in added:
+        print(f"➕ Added:    {path}")
+    for path in removed:
+        print(f"❌ Removed:  {path}")
+    for path in unreadable:
+        print(f"🚫 Unreadable: {path}")
+
+    if not (modified or added or removed or forged or unreadable):
+        print("\n✅ Tree matches the baseline (no change detected).\n")
+    else:
+        print(f"\n⚠️  {len(forged)} forged, {len(modified)} modified, {len(added)} added, "
+              f"{len(removed)} removed, {len(unreadable)} unreadable.\n")
+
 # ---- Main program ----
-print("=== File Integrity Checker ===")
-file_a = input("Enter the first file path: ")
-file_b = input("Enter the second file path: ")
+def main():
+    while True:
+        print("=== File Integrity Checker ===")
+        print("1. Compare two files")
+        print("2. Create directory baseline")
+        print("3. Check directory against baseline")
+        print("4. Incremental re-scan")
+        print("5. Save Merkle tree of a large file")
+        print("6. Locate changes against a saved Merkle tree")
+        print("7. Exit")
+
+        choice = input("Choose an option: ")
+
+        if choice == "1":
+            file_a = input("Enter the first file path: ")
+            file_b = input("Enter the second file path: ")
+            compare_files(file_a, file_b)
+            print()
+        elif choice == "2":
+            directory = input("Enter the directory to baseline: ")
+            manifest_file = input(f"Manifest file [{MANIFEST_FILE}]: ") or MANIFEST_FILE
+            algorithm = input(f"Algorithm {sorted(ALGORITHMS)} [sha256]: ") or "sha256"
+            if algorithm not in ALGORITHMS:
+                print("⚠️ Unknown algorithm.\n")
+                continue
+            manifest = create_baseline(directory, manifest_file, algorithm=algorithm)
+            print(f"✅ Baseline of {len(manifest['files'])} files saved to '{manifest_file}'.\n")
+        elif choice == "3":
+            manifest_file = input(f"Manifest file [{MANIFEST_FILE}]: ") or MANIFEST_FILE
+            if not os.path.exists(manifest_file):
+                print("⚠️ Manifest not found. Create a baseline first.\n")
+                continue
+            print_report(*check_baseline(manifest_file))
+        elif choice == "4":
+            directory = input("Enter the directory to scan: ")
+            sample = input("Paranoid re-hash sample size [0]: ") or "0"
+            print_report(*verify_incremental(directory, CACHE_FILE, int(sample)))
+        elif choice == "5":
+            filename = input("Enter the file path: ")
+            tree_file = input("Save tree as: ")
+            tree = build_merkle_tree(filename)
+            save_manifest(tree, tree_file)
+            print(f"✅ Merkle tree of {len(tree['levels'][0])} blocks saved to '{tree_file}'.")
+            print(f"🌳 Root: {tree['levels'][-1][0]}\n")
+        elif choice == "6":
+            tree_file = input("Saved tree file: ")
+            old_tree = load_manifest(tree_file)
+            new_tree = build_merkle_tree(old_tree["file"], old_tree["block_size"], old_tree["algorithm"])
+            ranges = diff_merkle_trees(old_tree, new_tree)
+            for start, end in ranges:
+                print(f"⚠️  Bytes {start:,} - {end:,} changed")
+            if not ranges:
+                print("✅ File matches the saved tree (no change detected).")
+            print()
+        elif choice == "7":
+            print("Goodbye!")
+            break
+        else:
+            print("Invalid choice.\n")
 
-compare_files(file_a, file_b)
+# The guard matters here: worker processes re-import this module.
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+# integrity_watch.py
+# Long-running integrity monitor: re-hashes files as soon as they change.
+# Uses Linux inotify (through ctypes) and falls back to an mtime poller.
+
+import os
+import time
+import ctypes
+import select
+import struct
+import ctypes.util
+from datetime import datetime
+from file_integrity_checker import (
+    MANIFEST_FILE, get_file_hash, hash_tree, load_manifest, walk_entries,
+)
+
+DEBOUNCE_SECONDS = 0.5   # wait for a burst of events to go quiet before hashing
+MAX_DELAY_SECONDS = 5    # ...but never hold a change back longer than this
+POLL_INTERVAL = 10       # seconds between scans when inotify is unavailable
+
+# inotify constants from <sys/inotify.h>
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0x00000800
+IN_CLOEXEC = 0x00080000
+
+WATCH_MASK = (IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+              | IN_CREATE | IN_DELETE | IN_DELETE_SELF)
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+def log(message):
+    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {message}", flush=True)
+
+# -------------------------------
+# Keeping track of known hashes
+# -------------------------------
+def load_known_hashes(directory, manifest_file=None):
+    """Start from a saved baseline if there is one, otherwise hash the tree now.
+
+    A baseline is checked against the tree once first, so changes made
+    before the watcher started are reported too.
+    Returns (known hashes by relative path, algorithm).
+    """
+    if manifest_file and os.path.exists(manifest_file):
+        manifest = load_manifest(manifest_file)
+        if manifest["root"] == os.path.abspath(directory):
+            files = manifest["files"]
+            known = {path: entry["hash"] for path, entry in files.items() if "hash" in entry}
+            algorithm = manifest.get("algorithm", "sha256")
+            log(f"🔍 Checking {directory} against the baseline in {manifest_file}...")
+            current = {os.path.relpath(e.path, directory) for e in walk_entries(directory)}
+            recheck(directory, known, set(known) | current, algorithm)
+            return known, algorithm
+    known = {path: entry["hash"] for path, entry in hash_tree(directory).items() if "hash" in entry}
+    return known, "sha256"
+
+def recheck(directory, known, paths, algorithm="sha256"):
+    """Re-hash only the touched files and report what changed."""
+    for rel in sorted(paths):
+        path = os.path.join(directory, rel)
+        if not os.path.isfile(path):
+            if known.pop(rel, None) is not None:
+                log(f"❌ Removed:  {rel}")
+            continue
+        try:
+            # Never mmap here: a file truncated while mapped would kill the watcher (SIGBUS)
+            digest = get_file_hash(path, algorithm, use_mmap=False)
+        except OSError:
+            continue
+        old = known.get(rel)
+        known[rel] = digest
+        if old is None:
+            log(f"➕ Added:    {rel}")
+        elif old != digest:
+            log(f"⚠️  Modified: {rel}")
+
+# -------------------------------
+# inotify backend
+# -------------------------------
+def load_libc():
+    """Return libc with inotify functions, or None when not on Linux."""
+    libc_name = ctypes.util.find_library("c")
+    if not libc_name:
+        return None
+    libc = ctypes.CDLL(libc_name, use_errno=True)
+    if not hasattr(libc, "inotify_init1"):
+        return None
+    libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    return libc
+
+def add_watches(libc, fd, directory, root, watches):
+    """Watch directory and every directory below it. watches maps wd -> relative dir."""
+    for current, _, _ in os.walk(directory):
+        wd = libc.inotify_add_watch(fd, os.fsencode(current), WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            log(f"⚠️ Cannot watch {current}: {os.strerror(errno)}")
+            continue
+        watches[wd] = os.path.relpath(current, root)
+
+def read_events(fd, watches):
+    """Drain the inotify fd and yield (relative path, mask) per event."""
+    while True:
+        try:
+            data = os.read(fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            base = watches.get(wd)
+            if mask & IN_IGNORED:
+                watches.pop(wd, None)
+                continue
+            if base is None and not mask & IN_Q_OVERFLOW:
+                continue
+            rel = os.path.normpath(os.path.join(base or ".", os.fsdecode(name)))
+            yield rel, mask
+
+def watch_inotify(libc, directory, known, algorithm="sha256"):
+    fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+    if fd < 0:
+        raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+    watches = {}
+    add_watches(libc, fd, directory, directory, watches)
+    log(f"👀 Watching {len(watches)} directories with inotify.")
+
+    try:
+        while True:
+            select.select([fd], [], [])  # sleeps with zero CPU until something happens
+            touched = set()
+            rescan = False
+            first_event = time.monotonic()
+
+            # Coalesce a burst: keep collecting until it has been quiet for a moment
+            while True:
+                for rel, mask in read_events(fd, watches):
+                    if mask & IN_Q_OVERFLOW:
+                        rescan = True
+                    elif mask & IN_ISDIR:
+                        if mask & (IN_CREATE | IN_MOVED_TO):
+                            new_dir = os.path.join(directory, rel)
+                            add_watches(libc, fd, new_dir, directory, watches)
+                            touched.update(os.path.relpath(e.path, directory) for e in walk_entries(new_dir))
+                        elif mask & IN_MOVED_FROM:
+                            touched.update(p for p in known if p.startswith(rel + os.sep))
+                    else:
+                        touched.add(rel)
+                if time.monotonic() - first_event > MAX_DELAY_SECONDS:
+                    break
+                ready, _, _ = select.select([fd], [], [], DEBOUNCE_SECONDS)
+                if not ready:
+                    break
+
+            if rescan:
+                log("⚠️ Event queue overflowed, re-checking the whole tree.")
+                touched = set(known) | {os.path.relpath(e.path, directory) for e in walk_entries(directory)}
+            recheck(directory, known, touched, algorithm)
+    finally:
+        os.close(fd)
+
+# -------------------------------
+# Polling fallback
+# -------------------------------
+def stat_tree(directory):
+    """Return relative path -> (size, mtime_ns, inode) using one stat per file."""
+    stats = {}
+    for entry in walk_entries(directory):
+        try:
+            st = entry.stat(follow_symlinks=False)
+        except OSError:
+            continue
+        stats[os.path.relpath(entry.path, directory)] = (st.st_size, st.st_mtime_ns, st.st_ino)
+    return stats
+
+def watch_polling(directory, known, algorithm="sha256", interval=POLL_INTERVAL):
+    log(f"👀 Polling {directory} every {interval}s (inotify unavailable).")
+    previous = stat_tree(directory)
+    while True:
+        time.sleep(interval)
+        current = stat_tree(directory)
+        touched = {path for path, st in current.items() if previous.get(path) != st}
+        touched |= previous.keys() - current.keys()
+        recheck(directory, known, touched, algorithm)
+        previous = current
+
+def watch(directory, manifest_file=None):
+    """Monitor a tree forever, reporting every added, modified or removed file."""
+    known, algorithm = load_known_hashes(directory, manifest_file)
+    log(f"✅ Tracking {len(known)} files under {os.path.abspath(directory)}.")
+    libc = load_libc()
+    if libc is not None:
+        try:
+            watch_inotify(libc, directory, known, algorithm)
+            return
+        except OSError as e:
+            log(f"⚠️ inotify failed ({e}), falling back to polling.")
+    watch_polling(directory, known, algorithm)
+
+def main():
+    print("=== File Integrity Watcher ===")
+    directory = input("Enter the directory to watch: ")
+    manifest_file = input(f"Baseline manifest, used if it covers this directory [{MANIFEST_FILE}]: ") or MANIFEST_FILE
+    try:
+        watch(directory, manifest_file)
+    except KeyboardInterrupt:
+        print("\nGoodbye!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# totp_engine.py
+# Fast TOTP (RFC 6238) checking for many users and sessions.
+#
+# Unlike building a pyotp.TOTP per check, each user's base32 secret is decoded
+# once and kept as a ready-keyed HMAC-SHA1 object (only .copy() per code).
+# The codes a user may enter right now, for the current time step plus/minus
+# the allowed drift, are computed once per 30-second step and reused until it ends.
+
+import hmac
+import time
+import base64
+import struct
+import hashlib
+
+DIGITS = 6
+INTERVAL = 30     # seconds per code
+DRIFT_STEPS = 1   # also accept the previous/next code, for clock skew
+
+def decode_secret(secret):
+    """Base32 secret (as made by pyotp.random_base32) -> key bytes."""
+    secret = secret.replace(" ", "").upper()
+    return base64.b32decode(secret + "=" * (-len(secret) % 8))
+
+def hotp(keyed_hmac, counter, digits=DIGITS):
+    """One HOTP code (RFC 4226) from a pre-keyed HMAC object."""
+    mac = keyed_hmac.copy()
+    mac.update(struct.pack(">Q", counter))
+    digest = mac.digest()
+    offset = digest[-1] & 0x0F
+    value = struct.unpack_from(">I", digest, offset)[0] & 0x7FFFFFFF
+    return str(value % 10 ** digits).zfill(digits)
+
+class TOTPEngine:
+    """Checks codes for users whose secrets come from lookup(username) -> secret or None."""
+
+    def __init__(self, lookup, digits=DIGITS, interval=INTERVAL, drift_steps=DRIFT_STEPS):
+        self.lookup = lookup
+        self.digits = digits
+        self.interval = interval
+        self.drift_steps = drift_steps
+        self.keys = {}   # username -> (secret, HMAC-SHA1 object keyed with it)
+        self.codes = {}  # username -> (time step, codes valid during that step)
+
+    def keyed_hmac(self, username):
+        """The user's ready-keyed HMAC, or None. Rebuilt only if the secret changed."""
+        secret = self.lookup(username)
+        if secret is None:
+            return None
+        cached = self.keys.get(username)
+        if cached is None or cached[0] != secret:
+            cached = self.keys[username] = (secret, hmac.new(decode_secret(secret), digestmod=hashlib.sha1))
+            self.codes.pop(username, None)
+        return cached[1]
+
+    def valid_codes(self, username, step):
+        """Codes accepted for this user during one time step (computed once per step)."""
+        keyed = self.keyed_hmac(username)
+        if keyed is None:
+            return ()
+        cached = self.codes.get(username)
+        if cached is None or cached[0] != step:
+            counters = range(max(0, step - self.drift_steps), step + self.drift_steps + 1)
+            cached = self.codes[username] = (step, tuple(hotp(keyed, c, self.digits) for c in counters))
+        return cached[1]
+
+    def step(self, for_time=None):
+        return int((time.time() if for_time is None else for_time) // self.interval)
+
+    def verify(self, username, code, for_time=None):
+        """True if code is valid for this user now (within the drift window)."""
+        return self.verify_batch([(username, code)], for_time)[0]
+
+    def verify_batch(self, pairs, for_time=None):
+        """Check many (username, code) pairs against one clock reading. Returns a list of bools."""
+        step = self.step(for_time)
+        results = []
+        for username, code in pairs:
+            code = str(code).strip()
+            # Typos like full-width digits can't match, and compare_digest rejects non-ASCII str
+            if len(code) != self.digits or not (code.isascii() and code.isdigit()):
+                results.append(False)
+                continue
+            results.append(any(hmac.compare_digest(code, valid) for valid in self.valid_codes(username, step)))
+        return results
+
+    def now(self, username):
+        """The user's current code (what their authenticator app shows), or None."""
+        keyed = self.keyed_hmac(username)
+        return None if keyed is None else hotp(keyed, self.step(), self.digits)
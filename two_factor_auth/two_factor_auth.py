@@ -1,48 +1,38 @@
 # two_factor_auth.py
 # Two-Factor Authentication (2FA) system using pyotp
+# (users are kept by the shared user_store module, codes are checked by totp_engine)
 
 import os
-import json
-import hashlib
-import binascii
 import pyotp
 from time import sleep
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from user_store import UserStore, new_password_record
+from totp_engine import TOTPEngine
 
 USERS_FILE = "users.json"
 
-def hash_password(password, salt):
-    """Hash password using SHA-256 with a salt."""
-    return hashlib.sha256(salt + password.encode()).hexdigest()
+store = UserStore(USERS_FILE)
+
+def otp_secret_for(username):
+    user = store.get(username)
+    return None if user is None else user.get("otp_secret")
+
+totp_engine = TOTPEngine(otp_secret_for)
 
 def register_user():
     username = input("Choose a username: ")
     password = input("Choose a password: ")
 
-    salt = os.urandom(16)
-    hashed_pw = hash_password(password, salt)
-    salt_hex = binascii.hexlify(salt).decode()
-
     # Generate a secret key for OTP
     otp_secret = pyotp.random_base32()
 
-    users = {}
-    if os.path.exists(USERS_FILE):
-        with open(USERS_FILE, "r") as f:
-            users = json.load(f)
-
-    if username in users:
+    record = new_password_record(password, store.kdf)
+    record["otp_secret"] = otp_secret
+    if not store.add(username, record):
         print("⚠️ User already exists.\n")
         return
 
-    users[username] = {
-        "salt": salt_hex,
-        "hash": hashed_pw,
-        "otp_secret": otp_secret
-    }
-
-    with open(USERS_FILE, "w") as f:
-        json.dump(users, f, indent=4)
-
     print(f"✅ User '{username}' registered successfully.")
     print(f"🔐 Save this secret key to use with an Authenticator app: {otp_secret}\n")
 
@@ -50,47 +40,31 @@ def login_user():
     username = input("Username: ")
     password = input("Password: ")
 
-    if not os.path.exists(USERS_FILE):
-        print("⚠️ No users registered yet.\n")
-        return
-
-    with open(USERS_FILE, "r") as f:
-        users = json.load(f)
-
-    if username not in users:
+    user_data = store.get(username)
+    if user_data is None:
         print("❌ User not found.\n")
         return
 
-    user_data = users[username]
-    salt = binascii.unhexlify(user_data["salt"])
-    hashed_pw = hash_password(password, salt)
-
-    if hashed_pw != user_data["hash"]:
+    if not store.verify(username, user_data, password):
         print("❌ Incorrect password.\n")
         return
 
     # OTP Verification
-    otp_secret = user_data["otp_secret"]
-    totp = pyotp.TOTP(otp_secret)
-
     print("📲 Please enter your 6-digit authentication code.")
     otp = input("OTP: ")
 
-    if totp.verify(otp):
+    if totp_engine.verify(username, otp):
         print("✅ 2FA successful! You are now logged in.\n")
     else:
         print("❌ Invalid or expired OTP.\n")
 
 def show_current_code(username):
     """Debug helper: shows current OTP (simulating a real Authenticator app)."""
-    with open(USERS_FILE, "r") as f:
-        users = json.load(f)
-    if username not in users:
+    code = totp_engine.now(username)
+    if code is None:
         print("❌ User not found.\n")
         return
-    otp_secret = users[username]["otp_secret"]
-    totp = pyotp.TOTP(otp_secret)
-    print(f"🔢 Current OTP for {username}: {totp.now()} (valid for ~30s)\n")
+    print(f"🔢 Current OTP for {username}: {code} (valid for ~30s)\n")
 
 # --- Menu ---
 while True:
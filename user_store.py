@@ -0,0 +1,430 @@
+# user_store.py
+# Shared user storage for the login apps (salted_login, two_factor_auth,
+# secure_storage, cloud_storage, secure_sharing).
+#
+# Users live in a users.json snapshot plus an append-only journal holding one
+# JSON line per user registered since the last compaction. Parsed users are
+# cached in memory: a lookup costs two stat() calls while nothing has changed,
+# and only the new journal lines are read when something has. The journal is
+# locked with flock on Linux/macOS and msvcrt.locking on Windows.
+#
+# Passwords are hashed with PBKDF2 or scrypt. Each record stores the KDF
+# parameters it was hashed with, so the cost can be raised at any time:
+#   python user_store.py calibrate --kdf scrypt --target-ms 50
+# benchmarks this machine and writes kdf.json, and every user still on older
+# parameters (or on the original single SHA-256) is rehashed at their next login.
+#
+# Many users can be added at once (hashed across a process pool, then written
+# as one new users.json) with:
+#   python user_store.py import new_users.csv --app secure_storage
+#
+# The apps sit in their own folders, so they import this module with:
+#   sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import os
+import csv
+import hmac
+import json
+import time
+import base64
+import hashlib
+import argparse
+import binascii
+import threading
+from functools import partial
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+COMPACT_MIN_ENTRIES = 1000  # never compact a journal smaller than this
+KDF_FILE = "kdf.json"       # parameters written by the calibrate command
+DEFAULT_KDF = {"name": "scrypt", "n": 2 ** 14, "r": 8, "p": 1}
+LEGACY_KDF = {"name": "sha256"}  # records without a "kdf" field
+
+# Where each app keeps a user's Fernet key: in the record, in keys/USER.key, or nowhere
+APP_KEYS = {
+    "salted_login": None,
+    "two_factor_auth": None,
+    "secure_storage": "record",
+    "secure_sharing": "record",
+    "cloud_storage": "file",
+}
+
+# -------------------------------
+# Passwords
+# -------------------------------
+def sha256_kdf(password, salt, params):
+    """The original scheme: one SHA256 of salt + password. Only used to verify old records."""
+    return hashlib.sha256(salt + password).digest()
+
+def pbkdf2_kdf(password, salt, params):
+    return hashlib.pbkdf2_hmac("sha256", password, salt, params["iterations"])
+
+def scrypt_kdf(password, salt, params):
+    n, r, p = params["n"], params["r"], params["p"]
+    # scrypt needs ~128 * r * n bytes; hashlib refuses more than 32 MiB unless told
+    return hashlib.scrypt(password, salt=salt, n=n, r=r, p=p, maxmem=256 * r * (n + p) + 2 ** 20, dklen=32)
+
+KDFS = {
+    "sha256": sha256_kdf,
+    "pbkdf2": pbkdf2_kdf,
+    "scrypt": scrypt_kdf,
+}
+
+def hash_password(password, salt, params):
+    """Hash password with salt using the KDF described by params. Returns hex."""
+    return KDFS[params["name"]](password.encode(), salt, params).hex()
+
+def new_password_record(password, params=DEFAULT_KDF):
+    """Return {"salt", "hash", "kdf"} for a password, using a fresh 16-byte salt."""
+    salt = os.urandom(16)
+    return {
+        "salt": binascii.hexlify(salt).decode(),
+        "hash": hash_password(password, salt, params),
+        "kdf": params,
+    }
+
+def check_password(record, password):
+    """True if password matches a user record's salt and hash."""
+    salt = binascii.unhexlify(record["salt"])
+    params = record.get("kdf", LEGACY_KDF)
+    return hmac.compare_digest(hash_password(password, salt, params), record["hash"])
+
+def load_kdf(kdf_file=KDF_FILE):
+    """The parameters new hashes should use: kdf.json if present, else DEFAULT_KDF."""
+    try:
+        with open(kdf_file, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return DEFAULT_KDF
+
+# -------------------------------
+# Calibration
+# -------------------------------
+def time_kdf(params, rounds=5):
+    """Median seconds for one hash with these parameters."""
+    salt = os.urandom(16)
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        hash_password("calibration password", salt, params)
+        times.append(time.perf_counter() - start)
+    return sorted(times)[len(times) // 2]
+
+def calibrate(name, target_ms):
+    """Pick parameters for this machine so one verify takes about target_ms."""
+    target = target_ms / 1000
+    if name == "pbkdf2":
+        # PBKDF2 cost is linear in the iteration count, so one sample is enough to scale from
+        sample = {"name": "pbkdf2", "iterations": 100_000}
+        iterations = int(sample["iterations"] * target / time_kdf(sample))
+        return {"name": "pbkdf2", "iterations": max(iterations, 10_000)}
+    if name == "scrypt":
+        # n must be a power of two: take the one whose time is closest to the target
+        best, best_error = None, None
+        n = 2 ** 10
+        while True:
+            params = {"name": "scrypt", "n": n, "r": 8, "p": 1}
+            elapsed = time_kdf(params)
+            error = abs(elapsed - target)
+            if best is None or error < best_error:
+                best, best_error = params, error
+            if elapsed >= target or n >= 2 ** 22:
+                return best
+            n *= 2
+    raise ValueError(f"Unknown KDF '{name}' (choose pbkdf2 or scrypt).")
+
+# -------------------------------
+# The store
+# -------------------------------
+def lock_file(f, exclusive):
+    """Block until f is locked: shared for readers, exclusive for writers."""
+    if fcntl:
+        fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        return
+    # Windows only has exclusive byte-range locks, so readers take turns too
+    f.seek(0)
+    while True:
+        try:
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            pass  # LK_LOCK gives up after ~10 seconds; keep waiting like flock does
+
+def unlock_file(f):
+    if fcntl:
+        fcntl.flock(f, fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+def file_id(path):
+    """(inode, mtime, size) of a file, or None if it doesn't exist."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+class UserStore:
+    """Cached view of users.json + its journal. Safe to share between threads."""
+
+    def __init__(self, users_file="users.json", journal_file=None, kdf_file=KDF_FILE):
+        self.users_file = users_file
+        self.journal_file = journal_file or os.path.splitext(users_file)[0] + ".journal"
+        self.kdf = load_kdf(kdf_file)  # parameters for new and upgraded hashes
+        self.users = {}           # username -> record, as of the last sync
+        self.snapshot = None      # file_id() of the users.json the cache came from
+        self.journal_offset = 0   # bytes of the journal already in the cache
+        self.journal_entries = 0  # lines of the journal already in the cache
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def locked_journal(self, exclusive=False):
+        """Open the journal with a shared (readers) or exclusive (writers) lock."""
+        with open(self.journal_file, "a+b") as journal:
+            lock_file(journal, exclusive)
+            try:
+                yield journal
+            finally:
+                journal.flush()
+                unlock_file(journal)
+
+    def is_current(self):
+        """True if neither file changed since the last sync (two stat() calls)."""
+        if file_id(self.users_file) != self.snapshot:
+            return False
+        journal = file_id(self.journal_file)
+        return (journal[2] if journal else 0) == self.journal_offset
+
+    def sync(self, journal):
+        """Bring the cache up to date. The caller holds a journal lock.
+
+        Only journal lines added since the last sync are read; the snapshot
+        is reloaded only after a compaction (by any process).
+        """
+        current = file_id(self.users_file)
+        if current != self.snapshot:
+            self.users = {}
+            if current is not None:
+                with open(self.users_file, "r") as f:
+                    self.users = json.load(f)
+            self.snapshot = current
+            self.journal_offset = self.journal_entries = 0
+
+        journal.seek(self.journal_offset)
+        for line in journal:
+            if not line.endswith(b"\n"):
+                break  # torn write from a crash; the next append starts a new line
+            self.journal_offset += len(line)
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if entry.get("update"):
+                self.users[entry["username"]] = entry["record"]
+            else:
+                self.users.setdefault(entry["username"], entry["record"])  # first registration wins
+            self.journal_entries += 1
+
+    def refresh(self):
+        if not self.is_current():
+            with self.locked_journal() as journal:
+                self.sync(journal)
+
+    def get(self, username):
+        """Return a user's record, or None."""
+        with self.lock:
+            self.refresh()
+            return self.users.get(username)
+
+    def add(self, username, record):
+        """Append one user to the journal. Returns False if the name is taken."""
+        with self.lock, self.locked_journal(exclusive=True) as journal:
+            self.sync(journal)
+            if username in self.users:
+                return False
+            self.append(journal, {"username": username, "record": record})
+        return True
+
+    def update(self, username, record, old_hash):
+        """Replace a user's record, but only if its stored hash is still old_hash.
+
+        Returns False if there is no such user or the record changed since the
+        caller read it (e.g. another process rehashed it first), so a stale
+        copy never overwrites a newer one.
+        """
+        with self.lock, self.locked_journal(exclusive=True) as journal:
+            self.sync(journal)
+            current = self.users.get(username)
+            if current is None or current.get("hash") != old_hash:
+                return False
+            self.append(journal, {"username": username, "record": record, "update": True})
+        return True
+
+    def add_many(self, records, before_commit=None):
+        """Add (username, record) pairs in one atomic commit. Returns the names added.
+
+        Names already taken (or repeated in the batch) are skipped. The batch is
+        merged straight into a new users.json, so readers see all of it or none.
+        before_commit(added), if given, runs under the exclusive lock just before
+        the commit, so nobody can register one of those names in between.
+        """
+        with self.lock, self.locked_journal(exclusive=True) as journal:
+            self.sync(journal)
+            users = dict(self.users)
+            added = []
+            for username, record in records:
+                if username not in users:
+                    users[username] = record
+                    added.append(username)
+            if added:
+                if before_commit is not None:
+                    before_commit(added)
+                self.compact(journal, users)
+        return added
+
+    def verify(self, username, record, password):
+        """Check a password. On success, a record hashed with anything other
+        than the current KDF parameters is rehashed and saved."""
+        if not check_password(record, password):
+            return False
+        if record.get("kdf") != self.kdf:
+            upgraded = dict(record, **new_password_record(password, self.kdf))
+            self.update(username, upgraded, record["hash"])  # no-op if the record changed meanwhile
+        return True
+
+    def append(self, journal, entry):
+        """Write one journal line. The caller holds the exclusive lock and has synced."""
+        if self.journal_offset < journal.seek(0, os.SEEK_END):
+            journal.write(b"\n")  # close off a torn line
+        journal.write((json.dumps(entry) + "\n").encode())
+        journal.flush()
+        self.users[entry["username"]] = entry["record"]
+        self.journal_offset = journal.tell()
+        self.journal_entries += 1
+        # Compacting once the journal matches the snapshot keeps the cost O(1) per user
+        if self.journal_entries >= max(COMPACT_MIN_ENTRIES, len(self.users) - self.journal_entries):
+            self.compact(journal)
+
+    def compact(self, journal, users=None):
+        """Fold the journal (or a replacement users dict) into a new users.json.
+        The caller holds the exclusive lock."""
+        users = self.users if users is None else users
+        tmp_file = self.users_file + ".tmp"
+        with open(tmp_file, "w") as f:
+            json.dump(users, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.users_file)
+        # Replaying lines already in the snapshot is harmless, so a crash here loses nothing
+        journal.truncate(0)
+        self.users = users
+        self.snapshot = file_id(self.users_file)
+        self.journal_offset = self.journal_entries = 0
+
+# -------------------------------
+# Bulk import
+# -------------------------------
+def read_import_file(path):
+    """Yield (username, password) per row of a CSV (username,password header) or JSONL file.
+
+    Missing values come back as None; the caller decides what is valid.
+    """
+    with open(path, "r", newline="") as f:
+        if path.endswith((".jsonl", ".json")):
+            rows = (json.loads(line) for line in f if line.strip())
+        else:
+            rows = csv.DictReader(f)
+        for row in rows:
+            if not isinstance(row, dict):
+                row = {}
+            yield row.get("username"), row.get("password")
+
+def make_user(user, params, with_key=False):
+    """Build one user's record (runs in a pool worker). Returns (username, record)."""
+    username, password = user
+    record = new_password_record(password, params)
+    if with_key:
+        record["key"] = base64.urlsafe_b64encode(os.urandom(32)).decode()  # same as Fernet.generate_key()
+    return username, record
+
+def import_users(path, store, key_mode=None, key_dir="keys", workers=None):
+    """Hash every user in a CSV/JSONL file across processes and add them in one commit.
+
+    Returns (added, skipped) counts.
+    """
+    store.refresh()
+    users, seen = [], set()
+    rows = 0
+    for username, password in read_import_file(path):
+        rows += 1
+        if not isinstance(username, str) or not username or not isinstance(password, str):
+            continue
+        if username not in seen and username not in store.users:
+            seen.add(username)
+            users.append((username, password))
+
+    worker = partial(make_user, params=store.kdf, with_key=key_mode is not None)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        records = list(pool.map(worker, users, chunksize=max(1, len(users) // 256)))
+
+    write_keys = None
+    if key_mode == "file":
+        keys = {username: record.pop("key") for username, record in records}
+
+        def write_keys(added):
+            # Runs under the store lock, only for names that are really new, so a key
+            # file left over from a crashed import (or a deleted user) is replaced,
+            # while the key of anyone already registered is never touched.
+            os.makedirs(key_dir, exist_ok=True)
+            for username in added:
+                key_path = os.path.join(key_dir, f"{username}.key")
+                fd = os.open(key_path + ".tmp", os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+                with os.fdopen(fd, "wb") as key_file:
+                    key_file.write(keys[username].encode())
+                os.replace(key_path + ".tmp", key_path)
+
+    added = store.add_many(records, write_keys)
+    return len(added), rows - len(added)
+
+def main():
+    parser = argparse.ArgumentParser(description="Password hashing settings for the login apps.")
+    commands = parser.add_subparsers(dest="command")
+    cal = commands.add_parser("calibrate", help="pick KDF parameters for a target verify time")
+    cal.add_argument("--kdf", choices=["pbkdf2", "scrypt"], default="scrypt", help="algorithm (default scrypt)")
+    cal.add_argument("--target-ms", type=float, default=50, help="time one login may spend hashing (default 50)")
+    cal.add_argument("--output", default=KDF_FILE, help=f"settings file to write (default {KDF_FILE})")
+    imp = commands.add_parser("import", help="add many users at once from CSV or JSONL")
+    imp.add_argument("input", help="CSV with username,password columns, or JSONL with those keys")
+    imp.add_argument("--app", choices=APP_KEYS, default="salted_login",
+                     help="app the users are for; decides where Fernet keys go")
+    imp.add_argument("--users-file", default="users.json", help="user store to add to (default users.json)")
+    imp.add_argument("--key-dir", default="keys", help="key folder for cloud_storage (default keys)")
+    imp.add_argument("--workers", type=int, default=None, help="hashing processes (default: all CPUs)")
+    args = parser.parse_args()
+
+    if args.command == "calibrate":
+        params = calibrate(args.kdf, args.target_ms)
+        elapsed = time_kdf(params)
+        with open(args.output, "w") as f:
+            json.dump(params, f, indent=4)
+        print(f"✅ {params} takes {elapsed * 1000:.1f} ms per verify on this machine.")
+        print(f"Saved to '{args.output}'. Users are rehashed with it at their next login.")
+    elif args.command == "import":
+        start = time.perf_counter()
+        store = UserStore(args.users_file)
+        added, skipped = import_users(args.input, store, APP_KEYS[args.app], args.key_dir, args.workers)
+        print(f"✅ Imported {added:,} users into '{args.users_file}' in {time.perf_counter() - start:.1f}s.")
+        if skipped:
+            print(f"⚠️ {skipped:,} rows skipped (username already taken, repeated or invalid).")
+    else:
+        parser.print_help()
+
+if __name__ == "__main__":
+    main()